@@ -0,0 +1,459 @@
+"""
+Latency and throughput benchmark of every /api route
+
+    python -m backend.generate                                   # dataset first (fresh database)
+    uvicorn backend.main:app --port 8000                         # server under test
+    python -m backend.benchmark                                  # run and compare with the baseline
+    python -m backend.benchmark --save-baseline                  # record a new baseline
+    python -m backend.benchmark --only tasks,search --concurrency 32
+    python -m backend.benchmark --only "tasks (hod)" --concurrency-sweep 1,4,16,64
+
+Each scenario sends `--requests` requests (after `--warmup` unmeasured
+ones) from `--concurrency` threads and reports p50/p95/p99 latency and
+throughput. The run fails when a scenario gets unexpected status codes,
+when p50/p95 latency or throughput is worse than the baseline by more
+than `--tolerance`, or when /openapi.json lists an /api route that has
+no scenario here. Baselines are machine specific: record them on the
+machine that runs the comparison.
+
+`--concurrency-sweep` instead runs the selected scenarios once per
+concurrency level and only prints throughput and latency per level. A
+worker that keeps many requests in flight gains throughput as concurrency
+rises until the database or CPU saturates; one that blocks its event loop
+on every query stays flat. Against any build of the server, so also for
+before/after comparisons of a change (see Read.md).
+
+Logs in with the accounts created by backend.generate.
+"""
+import argparse
+import base64
+import json
+import math
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+
+# Accounts created by backend.generate (not imported: the benchmark needs no database access)
+GENERATED_DOMAIN = "example.com"
+GENERATED_PASSWORD = "password123"
+
+BENCHMARK_BASELINE = Path(__file__).parent / "benchmarks" / "baseline.json"
+
+# Routes without a request/response scenario, and why
+EXCLUDED_ROUTES = {
+    ("GET", "/api/events"): "long-lived Server-Sent Events stream",
+}
+
+# Word in the titles of tasks the write scenarios create
+BENCHMARK_MARKER = "Benchmark"
+
+# Employees whose tokens the attendance and task-log scenarios rotate through
+EMPLOYEE_POOL_SIZE = 10
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Route template as listed in /openapi.json
+    route: str
+    # Account the request is sent as: "admin", "hod", "employee" or None
+    role: Optional[str]
+    # (context, request number) -> requests keyword arguments, including "url"
+    build: Callable[["BenchmarkContext", int], dict]
+    expected: tuple = (200,)
+    # Cap for scenarios dominated by bcrypt or writes of many rows
+    max_requests: Optional[int] = None
+
+
+class BenchmarkContext:
+    """Tokens, ids and sample data the scenarios build their requests from"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.run_id = uuid.uuid4().hex[:8]
+        self.local = threading.local()
+        self.tokens = {}
+        self.users = {}
+        self.employees = []
+        self.hod_task_ids = []
+        self.since_cursor = None
+
+    def session(self) -> requests.Session:
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def login(self, email: str):
+        response = self.session().post(
+            self.url("/api/auth/login"), json={"email": email, "password": GENERATED_PASSWORD}
+        )
+        if response.status_code != 200:
+            raise SystemExit(f"Login as {email} failed ({response.status_code}); run python -m backend.generate first")
+        body = response.json()
+        return body["token"], body["user"]
+
+    def setup(self):
+        for role, email in (("admin", "admin1"), ("hod", "hod1")):
+            self.tokens[role], self.users[role] = self.login(f"{email}@{GENERATED_DOMAIN}")
+
+        department_users = self.session().get(
+            self.url(f"/api/departments/{self.users['hod']['departmentId']}/users"),
+            headers=self.headers("hod")
+        ).json()
+        for user in [user for user in department_users if user["role"] == "Employee"][:EMPLOYEE_POOL_SIZE]:
+            token, profile = self.login(user["email"])
+            self.employees.append((token, profile))
+        if not self.employees:
+            raise SystemExit("The first HOD's department has no employees; generate more users")
+        self.tokens["employee"], self.users["employee"] = self.employees[0]
+
+        tasks = self.session().get(self.url("/api/tasks"), params={"limit": 500}, headers=self.headers("hod")).json()
+        self.hod_task_ids = [task["id"] for task in tasks if task["assignerId"] == self.users["hod"]["id"]]
+        if not self.hod_task_ids:
+            raise SystemExit("The first HOD has no tasks; generate more tasks")
+        cursor_time = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+        self.since_cursor = base64.urlsafe_b64encode(cursor_time.encode()).decode()
+
+    def reused_dataset(self) -> bool:
+        """True when an earlier run already added its tasks (generated titles never contain this word)"""
+        hits = self.session().get(
+            self.url("/api/search"), params={"q": BENCHMARK_MARKER, "type": "tasks", "limit": 1},
+            headers=self.headers("hod")
+        ).json()
+        return bool(hits)
+
+    def headers(self, role: Optional[str], number: int = 0) -> dict:
+        if role is None:
+            return {}
+        if role == "employee":
+            token = self.employees[number % len(self.employees)][0]
+        else:
+            token = self.tokens[role]
+        return {"Authorization": f"Bearer {token}"}
+
+    def employee(self, number: int) -> dict:
+        return self.employees[number % len(self.employees)][1]
+
+    def hod_task(self, number: int) -> str:
+        return self.hod_task_ids[number % len(self.hod_task_ids)]
+
+
+def get(path: str, **params):
+    return lambda context, number: {"url": context.url(path), "params": params}
+
+
+SCENARIOS = [
+    Scenario("health", "GET", "/api/health", None, get("/api/health")),
+    Scenario(
+        "login", "POST", "/api/auth/login", None,
+        lambda context, number: {
+            "url": context.url("/api/auth/login"),
+            "json": {"email": context.employee(number)["email"], "password": GENERATED_PASSWORD},
+        },
+        max_requests=50
+    ),
+    Scenario(
+        "register", "POST", "/api/auth/register", None,
+        lambda context, number: {
+            "url": context.url("/api/auth/register"),
+            "json": {
+                "name": f"Bench {number}",
+                "email": f"bench-{context.run_id}-{number}@{GENERATED_DOMAIN}",
+                "password": GENERATED_PASSWORD,
+                "role": "Employee",
+            },
+        },
+        max_requests=50
+    ),
+    Scenario("profile", "GET", "/api/user/profile", "employee", get("/api/user/profile")),
+    Scenario(
+        "department users", "GET", "/api/departments/{department_id}/users", "hod",
+        lambda context, number: {"url": context.url(f"/api/departments/{context.users['hod']['departmentId']}/users")}
+    ),
+    Scenario("tasks (hod)", "GET", "/api/tasks", "hod", get("/api/tasks")),
+    Scenario("tasks (employee)", "GET", "/api/tasks", "employee", get("/api/tasks")),
+    Scenario("tasks (admin)", "GET", "/api/tasks", "admin", get("/api/tasks")),
+    Scenario(
+        "task changes", "GET", "/api/tasks/changes", "hod",
+        lambda context, number: {"url": context.url("/api/tasks/changes"), "params": {"since": context.since_cursor}}
+    ),
+    Scenario(
+        "create task", "POST", "/api/tasks", "hod",
+        lambda context, number: {
+            "url": context.url("/api/tasks"),
+            "json": {
+                "title": f"Benchmark task {number}",
+                "description": "Created by the benchmark harness",
+                "priority": "Medium",
+                "assigneeIds": [context.employee(number)["id"]],
+            },
+        }
+    ),
+    Scenario(
+        "bulk create tasks", "POST", "/api/tasks/bulk", "hod",
+        lambda context, number: {
+            "url": context.url("/api/tasks/bulk"),
+            "json": {"tasks": [
+                {
+                    "title": f"Benchmark bulk task {number}.{i}",
+                    "priority": "Low",
+                    "assigneeIds": [context.employee(number + i)["id"]],
+                }
+                for i in range(10)
+            ]},
+        },
+        max_requests=50
+    ),
+    Scenario(
+        "bulk task status", "PATCH", "/api/tasks/bulk", "hod",
+        lambda context, number: {
+            "url": context.url("/api/tasks/bulk"),
+            "json": {
+                "taskIds": [context.hod_task(number * 10 + i) for i in range(10)],
+                "status": ["To Do", "In Progress", "Done"][number % 3],
+            },
+        }
+    ),
+    Scenario(
+        "update task", "PATCH", "/api/tasks/{task_id}", "hod",
+        lambda context, number: {
+            "url": context.url(f"/api/tasks/{context.hod_task(number)}"),
+            "json": {"status": ["To Do", "In Progress", "Done"][number % 3]},
+        }
+    ),
+    Scenario("dashboard summary", "GET", "/api/dashboard/summary", "hod", get("/api/dashboard/summary")),
+    Scenario(
+        "task-log totals", "GET", "/api/task-logs/totals", "hod",
+        get("/api/task-logs/totals", period="week", group_by="user")
+    ),
+    Scenario(
+        "task logs", "GET", "/api/task-logs/{user_id}", "employee",
+        lambda context, number: {"url": context.url(f"/api/task-logs/{context.employee(number)['id']}")}
+    ),
+    Scenario(
+        "create task log", "POST", "/api/task-logs", "employee",
+        lambda context, number: {
+            "url": context.url("/api/task-logs"),
+            "json": {"description": f"Benchmark work block {number}", "date": date.today().isoformat(), "durationMinutes": 30},
+        }
+    ),
+    Scenario("attendance status", "GET", "/api/attendance/status", "employee", get("/api/attendance/status")),
+    # The pool alternates between checked in and out, so "already checked in/out" answers are expected too
+    Scenario(
+        "check in", "POST", "/api/attendance/checkin", "employee",
+        lambda context, number: {"url": context.url("/api/attendance/checkin")}, expected=(200, 400)
+    ),
+    Scenario(
+        "check out", "POST", "/api/attendance/checkout", "employee",
+        lambda context, number: {"url": context.url("/api/attendance/checkout")}, expected=(200, 400)
+    ),
+    Scenario("attendance report", "GET", "/api/attendance/report", "hod", get("/api/attendance/report")),
+    Scenario("wfh requests", "GET", "/api/wfh", "hod", get("/api/wfh")),
+    Scenario(
+        "search", "GET", "/api/search", "hod",
+        lambda context, number: {
+            "url": context.url("/api/search"),
+            "params": {"q": ["invoice", "payroll", "audit", "onboarding", "dashboard"][number % 5]},
+        }
+    ),
+    Scenario(
+        "export tasks", "GET", "/api/exports/{resource}", "hod",
+        get("/api/exports/tasks", format="csv"), max_requests=50
+    ),
+    Scenario(
+        "import task logs", "POST", "/api/admin/import/{kind}", "admin",
+        lambda context, number: {
+            "url": context.url("/api/admin/import/task-logs"),
+            "params": {"format": "ndjson"},
+            "data": "\n".join(
+                json.dumps({
+                    "userEmail": context.employee(number + i)["email"],
+                    "description": f"Imported benchmark block {number}.{i}",
+                    "date": date.today().isoformat(),
+                    "durationMinutes": 15,
+                })
+                for i in range(20)
+            ),
+        },
+        max_requests=50
+    ),
+    Scenario("pool status", "GET", "/api/admin/pool", "admin", get("/api/admin/pool")),
+    Scenario("approvals", "GET", "/api/approvals", "employee", get("/api/approvals")),
+]
+
+
+def percentile(sorted_values, p: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def run_scenario(context: BenchmarkContext, scenario: Scenario, total: int, warmup: int, concurrency: int) -> dict:
+    def send(number: int):
+        kwargs = scenario.build(context, number)
+        started = time.perf_counter()
+        response = context.session().request(
+            scenario.method, headers=context.headers(scenario.role, number), **kwargs
+        )
+        response.content  # read the whole body, streamed exports included
+        return time.perf_counter() - started, response.status_code
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(warmup)))
+        started = time.perf_counter()
+        results = list(executor.map(send, range(warmup, warmup + total)))
+        elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    unexpected = {}
+    for _, status in results:
+        if status not in scenario.expected:
+            unexpected[status] = unexpected.get(status, 0) + 1
+    return {
+        "requests": total,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "throughput_rps": round(total / elapsed, 1),
+        "unexpected_statuses": unexpected,
+    }
+
+
+def uncovered_routes(context: BenchmarkContext):
+    """(method, route) pairs of /openapi.json with neither a scenario nor an exclusion"""
+    schema = context.session().get(context.url("/openapi.json")).json()
+    covered = {(scenario.method, scenario.route) for scenario in SCENARIOS} | set(EXCLUDED_ROUTES)
+    return sorted(
+        (method.upper(), path)
+        for path, operations in schema["paths"].items() if path.startswith("/api/")
+        for method in operations
+        if (method.upper(), path) not in covered
+    )
+
+
+def regressions(name: str, result: dict, baseline: dict, tolerance: float, min_delta_ms: float):
+    """Human readable regressions of one scenario against its baseline entry"""
+    found = []
+    for key in ("p50_ms", "p95_ms"):
+        allowed = baseline[key] + max(baseline[key] * tolerance, min_delta_ms)
+        if result[key] > allowed:
+            found.append(f"{name}: {key} {result[key]} > {allowed:.2f} (baseline {baseline[key]})")
+    allowed = baseline["throughput_rps"] / (1 + tolerance)
+    if result["throughput_rps"] < allowed:
+        found.append(f"{name}: throughput {result['throughput_rps']} < {allowed:.1f} req/s (baseline {baseline['throughput_rps']})")
+    return found
+
+
+def concurrency_sweep(context: BenchmarkContext, scenarios, levels, total: int, warmup: int):
+    """Throughput and latency of each scenario at each concurrency level (no baseline)"""
+    print(f"{'scenario':<22}{'clients':>8}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}")
+    failures = []
+    for scenario in scenarios:
+        for level in levels:
+            result = run_scenario(context, scenario, min(total, scenario.max_requests or total), warmup, level)
+            print(f"{scenario.name:<22}{level:>8}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['throughput_rps']:>10}")
+            if result["unexpected_statuses"]:
+                failures.append(f"{scenario.name} x{level}: unexpected status codes {result['unexpected_statuses']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every /api route against a running server")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per scenario")
+    parser.add_argument("--only", help="comma-separated scenario name fragments")
+    parser.add_argument("--baseline", type=Path, default=BENCHMARK_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="latency increases below this never fail")
+    parser.add_argument("--reuse-data", action="store_true", help="run against a dataset an earlier run already wrote to")
+    parser.add_argument(
+        "--concurrency-sweep", metavar="LEVELS",
+        help="comma-separated concurrency levels; prints throughput per level instead of comparing with the baseline"
+    )
+    args = parser.parse_args()
+
+    context = BenchmarkContext(args.base_url)
+    context.setup()
+
+    scenarios = SCENARIOS
+    if args.only:
+        fragments = [fragment.strip() for fragment in args.only.split(",")]
+        scenarios = [scenario for scenario in SCENARIOS if any(fragment in scenario.name for fragment in fragments)]
+
+    if args.concurrency_sweep:
+        levels = [int(level) for level in args.concurrency_sweep.split(",")]
+        failures = concurrency_sweep(context, scenarios, levels, args.requests, args.warmup)
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1 if failures else 0)
+
+    # Write scenarios add thousands of rows per run, so later runs read more data than the baseline did
+    if context.reused_dataset() and not args.reuse_data:
+        raise SystemExit(
+            "This dataset was already used by a benchmark run; generate a fresh database "
+            "(or pass --reuse-data for a run that is not compared with the baseline)."
+        )
+    if args.reuse_data and args.save_baseline:
+        parser.error("--save-baseline needs a freshly generated dataset")
+    uncovered = uncovered_routes(context)
+
+    baseline = {}
+    if args.baseline.exists() and not (args.save_baseline or args.reuse_data):
+        saved = json.loads(args.baseline.read_text())
+        baseline = saved["results"]
+        if saved["settings"] != {"concurrency": args.concurrency, "requests": args.requests}:
+            print(f"⚠️ Baseline was recorded with {saved['settings']}; comparisons may be skewed.")
+
+    results = {}
+    failures = []
+    print(f"{'scenario':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for scenario in scenarios:
+        total = min(args.requests, scenario.max_requests or args.requests)
+        result = run_scenario(context, scenario, total, args.warmup, args.concurrency)
+        results[scenario.name] = result
+        print(
+            f"{scenario.name:<22}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['throughput_rps']:>10}"
+        )
+        if result["unexpected_statuses"]:
+            failures.append(f"{scenario.name}: unexpected status codes {result['unexpected_statuses']}")
+        if scenario.name in baseline:
+            failures += regressions(scenario.name, result, baseline[scenario.name], args.tolerance, args.min_delta_ms)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            "settings": {"concurrency": args.concurrency, "requests": args.requests},
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "results": {
+                name: {key: value for key, value in result.items() if key != "unexpected_statuses"}
+                for name, result in results.items()
+            },
+        }, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+
+    for method, route in uncovered:
+        failures.append(f"{method} {route}: no benchmark scenario")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ No regressions.")
+
+
+if __name__ == "__main__":
+    main()
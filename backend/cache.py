@@ -0,0 +1,84 @@
+"""
+Small in-process caches shared by the API
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+# Session.info key of the evictions waiting for that session to commit
+PENDING_EVICTIONS = "pending_cache_evictions"
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def evict_where(self, predicate):
+        """Drop every entry whose value matches `predicate`"""
+        with self._lock:
+            for key in [k for k, (v, _) in self._data.items() if predicate(v)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def evict_after_commit(instance, cache: TTLCache, key=None, where=None):
+    """
+    Drop `key` (or every entry whose value matches `where`) from `cache` once
+    the session flushing `instance` commits. Call from mapper events: they fire
+    at flush, while other sessions still read the old committed rows and could
+    cache them again.
+    """
+    object_session(instance).info.setdefault(PENDING_EVICTIONS, []).append((cache, key, where))
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed(session):
+    for cache, key, where in session.info.pop(PENDING_EVICTIONS, ()):
+        if where is None:
+            cache.pop(key)
+        else:
+            cache.evict_where(where)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session, previous_transaction):
+    # A savepoint rollback keeps the evictions of the enclosing transaction
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_EVICTIONS, None)
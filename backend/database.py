@@ -1,38 +1,323 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from .models import Base, Department, User, UserRole
+from sqlalchemy import create_engine, delete, event, exc, func, insert, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Optional
+from .models import Department, TaskLog, TaskLogDailyTotal, User, UserRole
+from .passwords import hash_password_sync as hash_password
+import asyncio
+import math
 import os
-from datetime import datetime
-import bcrypt
+import time
+from contextlib import contextmanager
+from time import perf_counter
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
 from dotenv import load_dotenv
 load_dotenv()
 
 # Database URL
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Create engine
-engine = create_engine(DATABASE_URL)
+# Async drivers used by the request path for each sync URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-# Create session factory
+def async_database_url(url: str):
+    """Map DATABASE_URL onto the matching asyncio driver (asyncpg / aiosqlite)"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+def asyncpg_dsn(url: str) -> str:
+    """DATABASE_URL as a plain postgresql:// DSN: asyncpg.connect rejects SQLAlchemy driver suffixes"""
+    url = make_url(url)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+# Connection pool settings, per engine and per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Replace connections older than this many seconds (-1 keeps them forever)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test connections on checkout so a database restart costs a reconnect, not a failed request
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Postgres statement_timeout in milliseconds (0 disables it)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+def engine_options(url, is_async: bool):
+    """create_engine() keyword arguments for the pool and statement timeout settings"""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a single shared connection, not a sized pool
+        return {}
+
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "sqlite":
+        # Wait for the database write lock as long as for a pooled connection
+        # (sqlite3 gives up after 5 s, which a check-in burst can exceed)
+        options["connect_args"] = {"timeout": DB_POOL_TIMEOUT}
+    if DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+class PoolStats:
+    """Counters behind the request-path pool gauges (see pool_status())"""
+
+    def __init__(self):
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_wait_seconds = 0.0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self.last_connect_seconds = 0.0
+
+    def record_connect(self, seconds: float):
+        self.connects += 1
+        self.connect_seconds += seconds
+        self.last_connect_seconds = seconds
+
+pool_stats = PoolStats()
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that counts callers waiting for a connection"""
+
+    def _do_get(self):
+        pool_stats.waiting += 1
+        started = perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.checkout_timeouts += 1
+            raise
+        finally:
+            pool_stats.waiting -= 1
+            pool_stats.checkout_wait_seconds += perf_counter() - started
+        pool_stats.checkouts += 1
+        return connection
+
+# Create engines: sync for schema setup and scripts, async for request handlers
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, is_async=False))
+async_options = engine_options(DATABASE_URL, is_async=True)
+if async_options:
+    async_options["poolclass"] = InstrumentedAsyncPool
+async_engine = create_async_engine(async_database_url(DATABASE_URL), **async_options)
+
+@event.listens_for(async_engine.sync_engine, "do_connect")
+def timed_connect(dialect, conn_rec, cargs, cparams):
+    """Open new request-path connections ourselves to measure connect latency"""
+    started = perf_counter()
+    connection = dialect.connect(*cargs, **cparams)
+    pool_stats.record_connect(perf_counter() - started)
+    return connection
+
+def pool_status():
+    """Live gauges and counters of the request-path (async) pool in this worker"""
+    pool = async_engine.pool
+    sized = isinstance(pool, AsyncAdaptedQueuePool)
+    return {
+        "size": pool.size() if sized else 1,
+        "maxOverflow": DB_MAX_OVERFLOW if sized else 0,
+        "checkedOut": pool.checkedout() if sized else 0,
+        "checkedIn": pool.checkedin() if sized else 0,
+        "overflow": max(pool.overflow(), 0) if sized else 0,
+        "waiting": pool_stats.waiting,
+        "checkouts": pool_stats.checkouts,
+        "checkoutWaitSeconds": pool_stats.checkout_wait_seconds,
+        "checkoutTimeouts": pool_stats.checkout_timeouts,
+        "connects": pool_stats.connects,
+        "connectSeconds": pool_stats.connect_seconds,
+        "lastConnectSeconds": pool_stats.last_connect_seconds,
+    }
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# Optional read replica for the read-only endpoints (see get_read_db in main.py)
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+# Reads go to the primary while the replica may be further behind than this (seconds)
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))
+# A client's reads stay on the primary this long after it committed a write
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "10"))
+# Replica lag is measured in the background at most this often per worker
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "1"))
+REPLICA_LAG_CHECK_TIMEOUT = 2
+
+# Zero when the standby has replayed everything it received (an idle primary
+# would otherwise look like lag); also zero on a server that is not in recovery
+POSTGRES_REPLICA_LAG = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
 
-def init_db():
-    """Initialize database with tables and seed data"""
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+replica_engine = None
+if DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        async_database_url(DATABASE_REPLICA_URL), **engine_options(DATABASE_REPLICA_URL, is_async=True)
+    )
+ReplicaSessionLocal = async_sessionmaker(
+    bind=replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+class ReplicaRouter:
+    """
+    Decides per read whether the replica may serve it: only while its
+    measured lag (plus the age of the measurement) is within
+    DB_REPLICA_MAX_LAG, and not for clients that wrote in the last
+    DB_REPLICA_STICKY_SECONDS. Lag is measured by a background task, so a
+    slow or unreachable replica never delays a request; reads just stay on
+    the primary until a check succeeds.
+    """
+
+    def __init__(self):
+        self.lag = None
+        self.measured_at = 0.0
+        self.checked_at = float("-inf")
+        self.checking = False
+        self.task = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    async def measure_lag(self) -> float:
+        async with replica_engine.connect() as connection:
+            if connection.dialect.name == "postgresql":
+                return float(await connection.scalar(POSTGRES_REPLICA_LAG))
+            # No replication status to read (e.g. a second local database): reachable means current
+            await connection.execute(text("SELECT 1"))
+            return 0.0
+
+    async def refresh(self):
+        try:
+            self.lag = await asyncio.wait_for(self.measure_lag(), timeout=REPLICA_LAG_CHECK_TIMEOUT)
+            self.measured_at = time.monotonic()
+        except Exception:
+            self.lag = None
+        finally:
+            self.checking = False
+
+    def replica_is_fresh(self) -> bool:
+        now = time.monotonic()
+        if not self.checking and now - self.checked_at >= DB_REPLICA_LAG_CHECK_INTERVAL:
+            self.checking = True
+            self.checked_at = now
+            self.task = asyncio.get_running_loop().create_task(self.refresh())
+        # The replica may have fallen further behind since it was measured
+        return self.lag is not None and self.lag + (now - self.measured_at) <= DB_REPLICA_MAX_LAG
+
+    def use_replica(self, recently_wrote: bool) -> bool:
+        use = (
+            replica_engine is not None
+            and not recently_wrote
+            and self.replica_is_fresh()
+        )
+        if use:
+            self.replica_reads += 1
+        else:
+            self.primary_reads += 1
+        return use
+
+replica_router = ReplicaRouter()
+
+# Read-your-writes: a commit on a request session sets a short-lived cookie
+# holding the write time, and reads carrying it stay on the primary. The
+# client carries the marker, so it holds whichever worker serves the next read.
+LAST_WRITE_COOKIE = "taskflow_last_write"
+
+def wrote_recently(last_write: Optional[str]) -> bool:
+    """Whether a LAST_WRITE_COOKIE value is within DB_REPLICA_STICKY_SECONDS"""
+    try:
+        return time.time() - float(last_write) < DB_REPLICA_STICKY_SECONDS
+    except (TypeError, ValueError):
+        return False
+
+@event.listens_for(Session, "after_commit")
+def _mark_last_write(session):
+    # get_current_user attaches the request's response to its session
+    response = session.info.get("response")
+    if response is not None and replica_engine is not None:
+        response.set_cookie(
+            LAST_WRITE_COOKIE, str(time.time()), max_age=math.ceil(DB_REPLICA_STICKY_SECONDS),
+            httponly=True, samesite="strict"
+        )
+
+MIGRATIONS_PATH = Path(__file__).parent / "migrations"
+
+def run_migrations():
+    """Upgrade the schema to the latest Alembic revision"""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_PATH))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+
+# Arbitrary key of the Postgres advisory lock that serializes schema setup
+INIT_LOCK_KEY = 72651001
+
+@contextmanager
+def init_lock():
+    """Let only one process at a time run migrations and seeding"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
     
-    # Seed initial data
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": INIT_LOCK_KEY})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INIT_LOCK_KEY})
+
+def init_db(seed: bool = True):
+    """Initialize database with tables and seed data (run once per deploy, not per worker)"""
+    with init_lock():
+        # Apply versioned migrations
+        run_migrations()
+        
+        if seed:
+            seed_db()
+
+def rebuild_task_log_totals():
+    """Recompute task_log_daily_totals from task_logs; returns the number of rollup rows"""
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            # Hold back concurrent create_task_log upserts until the rebuilt rows are committed
+            connection.execute(text("LOCK TABLE task_log_daily_totals IN EXCLUSIVE MODE"))
+        connection.execute(delete(TaskLogDailyTotal))
+        result = connection.execute(insert(TaskLogDailyTotal).from_select(
+            ["user_id", "date", "minutes", "log_count"],
+            select(
+                TaskLog.user_id,
+                TaskLog.date,
+                func.coalesce(func.sum(TaskLog.duration_minutes), 0),
+                func.count()
+            ).group_by(TaskLog.user_id, TaskLog.date)
+        ))
+        return result.rowcount
+
+def seed_db():
+    """Seed departments and demo users into an empty database"""
     db = SessionLocal()
     try:
         # Check if departments exist
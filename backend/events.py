@@ -0,0 +1,236 @@
+"""
+Task and attendance event broker for the /api/events stream
+
+Task events carry only task ids (clients refetch what changed), so
+messages stay below the NOTIFY payload limit. Bulk writes publish one
+tasks.bulk event with all their ids instead of one event per task.
+"""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+
+from .database import AsyncSessionLocal, asyncpg_dsn
+from .models import Task, TaskAssignee, User
+
+logger = logging.getLogger(__name__)
+
+# "memory" delivers within this worker; "postgres" fans out across workers with LISTEN/NOTIFY
+EVENT_BACKEND = os.getenv("EVENT_BACKEND", "memory")
+EVENT_CHANNEL = "taskflow_events"
+SUBSCRIBER_QUEUE_SIZE = 100
+# pg_notify rejects payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7999
+# Seconds between attempts to re-establish a lost LISTEN connection, doubling up to the max
+EVENT_RECONNECT_MIN_DELAY = 0.5
+EVENT_RECONNECT_MAX_DELAY = 30
+
+
+@dataclass
+class Event:
+    """
+    A published change plus the audience fields used for role scoping:
+    `user_ids` are the users directly involved (task assignees, the attendee),
+    `department_ids` their departments and `creator_ids` the task assigners.
+    """
+    type: str
+    data: dict
+    user_ids: set = field(default_factory=set)
+    department_ids: set = field(default_factory=set)
+    creator_ids: set = field(default_factory=set)
+
+    def visible_to(self, principal) -> bool:
+        # Same rules as get_tasks: admins see everything, HODs their department
+        # and what they created, employees only what they are part of
+        if principal.role == "Super Admin":
+            return True
+        if principal.id in self.user_ids:
+            return True
+        if principal.role == "HOD":
+            return principal.id in self.creator_ids or principal.department_id in self.department_ids
+        return False
+
+    def to_message(self) -> dict:
+        return {
+            "type": self.type,
+            "data": self.data,
+            "user_ids": [str(i) for i in self.user_ids],
+            "department_ids": [str(i) for i in self.department_ids if i],
+            "creator_ids": [str(i) for i in self.creator_ids if i]
+        }
+
+    @classmethod
+    def from_message(cls, message: dict) -> "Event":
+        return cls(
+            type=message["type"],
+            data=message["data"],
+            user_ids={uuid.UUID(i) for i in message["user_ids"]},
+            department_ids={uuid.UUID(i) for i in message["department_ids"]},
+            creator_ids={uuid.UUID(i) for i in message["creator_ids"]}
+        )
+
+
+class MemoryBackend:
+    """Delivers published messages straight back to this process"""
+
+    async def start(self, deliver):
+        self._deliver = deliver
+
+    async def publish(self, message: dict):
+        self._deliver(message)
+
+    async def stop(self):
+        pass
+
+
+class PostgresBackend:
+    """
+    Fans messages out to every worker through Postgres NOTIFY. While the LISTEN
+    connection is down it reconnects in the background and delivers to this
+    worker only; clients of other workers catch up through /api/tasks/changes.
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._lock = asyncio.Lock()
+        self._conn = None
+        self._reconnect = None
+
+    async def start(self, deliver):
+        self._deliver = deliver
+        await self._connect()
+
+    async def _connect(self):
+        import asyncpg
+
+        conn = await asyncpg.connect(asyncpg_dsn(self.dsn))
+        conn.add_termination_listener(self._connection_lost)
+        await conn.add_listener(
+            EVENT_CHANNEL,
+            lambda connection, pid, channel, payload: self._deliver(json.loads(payload))
+        )
+        self._conn = conn
+
+    def _connection_lost(self, connection):
+        if connection is not self._conn:
+            # Closed by stop()
+            return
+        logger.warning("Event LISTEN connection lost, reconnecting")
+        self._conn = None
+        self._reconnect = asyncio.get_running_loop().create_task(self._reconnect_with_backoff())
+
+    async def _reconnect_with_backoff(self):
+        delay = EVENT_RECONNECT_MIN_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except Exception:
+                logger.warning("Event LISTEN reconnect failed, retrying in %ss", delay, exc_info=True)
+                delay = min(delay * 2, EVENT_RECONNECT_MAX_DELAY)
+            else:
+                logger.info("Event LISTEN connection restored")
+                return
+
+    async def publish(self, message: dict):
+        if self._conn is None:
+            self._deliver(message)
+            return
+        payload = json.dumps(message)
+        if len(payload.encode("utf-8")) > NOTIFY_MAX_BYTES:
+            # Too many assignees to list: receivers look the audience up (task events only)
+            payload = json.dumps({**message, "user_ids": None, "department_ids": None, "creator_ids": None})
+        async with self._lock:
+            await self._conn.execute("SELECT pg_notify($1, $2)", EVENT_CHANNEL, payload)
+
+    async def stop(self):
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            await conn.close()
+
+
+async def task_audience(message: dict) -> dict:
+    """Fill in the assignees, their departments and the assigners of a task event sent without them"""
+    data = message["data"]
+    task_ids = [uuid.UUID(i) for i in data["ids"]] if "ids" in data else [uuid.UUID(data["id"])]
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(TaskAssignee.assignee_id, User.department_id)
+            .join(User, User.id == TaskAssignee.assignee_id)
+            .where(TaskAssignee.task_id.in_(task_ids))
+        )).all()
+        creator_ids = (await db.scalars(select(Task.assigner_id).where(Task.id.in_(task_ids)))).all()
+    return {
+        **message,
+        "user_ids": sorted({str(user_id) for user_id, _ in rows}),
+        "department_ids": sorted({str(department_id) for _, department_id in rows if department_id}),
+        "creator_ids": sorted({str(creator_id) for creator_id in creator_ids if creator_id}),
+    }
+
+
+class EventBroker:
+    def __init__(self, backend):
+        self.backend = backend
+        self._subscribers = set()
+        self._lookups = set()
+
+    async def start(self):
+        await self.backend.start(self._deliver)
+
+    async def stop(self):
+        await self.backend.stop()
+
+    async def publish(self, event: Event):
+        """
+        Best effort: called after the change is committed, so a broker failure
+        is logged instead of failing the request. Clients catch up through
+        /api/tasks/changes and their next reload.
+        """
+        try:
+            await self.backend.publish(event.to_message())
+        except Exception:
+            logger.exception("Could not publish %s event", event.type)
+
+    def _deliver(self, message: dict):
+        if message["user_ids"] is None:
+            lookup = asyncio.get_running_loop().create_task(self._deliver_with_audience(message))
+            self._lookups.add(lookup)
+            lookup.add_done_callback(self._lookups.discard)
+            return
+        event = Event.from_message(message)
+        for principal, queue in list(self._subscribers):
+            if event.visible_to(principal):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # Slow client: it misses this event and catches up via /api/tasks/changes
+                    pass
+
+    async def _deliver_with_audience(self, message: dict):
+        try:
+            self._deliver(await task_audience(message))
+        except Exception:
+            logger.exception("Could not resolve the audience of a %s event", message["type"])
+
+    def subscribe(self, principal):
+        subscription = (principal, asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscribers.discard(subscription)
+
+
+def create_broker() -> EventBroker:
+    if EVENT_BACKEND == "postgres":
+        return EventBroker(PostgresBackend(os.getenv("DATABASE_URL")))
+    return EventBroker(MemoryBackend())
+
+
+broker = create_broker()
@@ -0,0 +1,61 @@
+"""
+Streaming CSV / NDJSON serialization for the /api/exports endpoints
+"""
+import csv
+import enum
+import io
+import json
+import uuid
+from datetime import date, datetime
+
+from .database import AsyncSessionLocal
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_value(value):
+    """Plain CSV/JSON value for a column read from the database"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def csv_lines(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        ["" if value is None else export_value(value) for value in row] for row in rows
+    )
+    return buffer.getvalue()
+
+
+def ndjson_lines(keys, rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(keys, map(export_value, row)))) + "\n" for row in rows
+    )
+
+
+async def stream_export(build_query, export_format: str):
+    """
+    Yield the rows of `build_query(db)` one batch at a time. The query runs
+    on a session owned by the stream, so the request's own session can be
+    released before the first byte is sent.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            build_query(db).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        keys = list(result.keys())
+        if export_format == "csv":
+            yield csv_lines([keys])
+        async for rows in result.partitions():
+            yield csv_lines(rows) if export_format == "csv" else ndjson_lines(keys, rows)
@@ -0,0 +1,319 @@
+"""
+Synthetic dataset for load tests and benchmarks
+
+    python -m backend.generate                                  # defaults below
+    python -m backend.generate --departments 40 --users 5000 --tasks 50000 --days 180
+
+Creates departments, users, tasks with assignees, task logs, attendance
+and WFH requests over the last `--days` days, then rebuilds the task-log
+daily totals. The same `--seed` always produces the same rows, ids
+included, so benchmark runs are comparable.
+
+Accounts are `admin<n>@example.com`, `hod<n>@example.com` (one per
+department, in department order) and `employee<n>@example.com`, all with
+the password `password123`.
+"""
+import argparse
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import func, select, text
+
+from .database import engine, init_db, rebuild_task_log_totals
+from .imports import IMPORT_BATCH_SIZE, batched, bulk_insert
+from .models import (
+    Attendance, Department, Task, TaskAssignee, TaskLog, TaskPriority, TaskStatus,
+    User, UserRole, WFHRequest, WFHStatus
+)
+from .passwords import hash_password_sync
+
+GENERATED_DOMAIN = "example.com"
+GENERATED_PASSWORD = "password123"
+
+DEPARTMENT_NAMES = [
+    "Engineering", "Marketing", "HR", "Finance", "Sales", "Support", "Operations",
+    "Legal", "Design", "Data", "Security", "Procurement", "Facilities", "Research",
+]
+FIRST_NAMES = [
+    "Aarav", "Ana", "Ben", "Chen", "Divya", "Elena", "Farah", "Gabriel", "Hana", "Ibrahim",
+    "Jonas", "Kavya", "Liam", "Maya", "Noah", "Olga", "Priya", "Quinn", "Rahul", "Sara",
+    "Tomas", "Uma", "Victor", "Wei", "Yusuf", "Zoe",
+]
+LAST_NAMES = [
+    "Ahmed", "Brown", "Costa", "Das", "Evans", "Fischer", "Garcia", "Hughes", "Iyer", "Jensen",
+    "Khan", "Lopez", "Murphy", "Nair", "Okafor", "Patel", "Rossi", "Silva", "Tanaka", "Weber",
+]
+VERBS = [
+    "Review", "Update", "Prepare", "Fix", "Design", "Migrate", "Document", "Audit",
+    "Plan", "Test", "Deploy", "Refactor", "Analyze", "Draft", "Coordinate",
+]
+NOUNS = [
+    "invoice workflow", "onboarding checklist", "quarterly report", "login page", "payroll export",
+    "vendor contract", "release notes", "customer survey", "database backup", "hiring plan",
+    "budget forecast", "support macros", "marketing campaign", "API documentation", "office move",
+    "security review", "sales dashboard", "training material", "expense policy", "search index",
+]
+DETAILS = [
+    "with the {department} team", "before the monthly review", "for the client meeting",
+    "and share findings in the channel", "following last week's feedback", "for the audit",
+    "including edge cases", "and update the tracker", "with stakeholders from {department}",
+]
+WFH_REASONS = [
+    "Home internet installation", "Family commitment", "Focus time for a deadline",
+    "Medical appointment", "Travel day", "Building maintenance at the office",
+]
+
+# Task assignee count weights: mostly one person, sometimes a small group
+ASSIGNEE_COUNTS = ([1, 2, 3], [70, 20, 10])
+PRIORITIES = ([TaskPriority.LOW, TaskPriority.MEDIUM, TaskPriority.HIGH], [30, 50, 20])
+# Logs per employee on a day they log anything
+LOGS_PER_DAY = ([1, 2, 3, 4], [35, 35, 20, 10])
+
+
+def seeded_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def working_days(days: int, today: date):
+    for offset in range(days, -1, -1):
+        day = today - timedelta(days=offset)
+        if day.weekday() < 5:
+            yield day
+
+
+def sentence(rng: random.Random, department: str) -> str:
+    return f"{rng.choice(VERBS)} {rng.choice(NOUNS)} {rng.choice(DETAILS).format(department=department)}"
+
+
+def generate_departments(rng, count):
+    now = datetime.utcnow()
+    return [
+        {
+            "id": seeded_uuid(rng),
+            "name": DEPARTMENT_NAMES[i % len(DEPARTMENT_NAMES)] + (f" {i // len(DEPARTMENT_NAMES) + 1}" if i >= len(DEPARTMENT_NAMES) else ""),
+            "description": "Generated department",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def generate_users(rng, departments, count, password_hash):
+    """One HOD per department, one admin per 500 users, and employees spread unevenly over departments"""
+    now = datetime.utcnow()
+    # Department sizes vary a lot in real organisations: lognormal weights
+    weights = [rng.lognormvariate(0, 0.6) for _ in departments]
+    admins = max(1, count // 500)
+    roles = [UserRole.HOD] * len(departments) + [UserRole.SUPER_ADMIN] * admins
+    roles += [UserRole.EMPLOYEE] * max(0, count - len(roles))
+    numbers = {role: 0 for role in UserRole}
+    slugs = {UserRole.EMPLOYEE: "employee", UserRole.HOD: "hod", UserRole.SUPER_ADMIN: "admin"}
+
+    users = []
+    for index, role in enumerate(roles):
+        numbers[role] += 1
+        if role == UserRole.HOD:
+            department = departments[index]
+        else:
+            department = rng.choices(departments, weights)[0]
+        users.append({
+            "id": seeded_uuid(rng),
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "email": f"{slugs[role]}{numbers[role]}@{GENERATED_DOMAIN}",
+            "password": password_hash,
+            "role": role,
+            "department_id": department["id"],
+            "avatar_url": None,
+            "created_at": now,
+            "updated_at": now,
+        })
+    return users
+
+
+def generate_tasks(rng, departments, users, count, days, now):
+    """Tasks assigned by HODs within their department (admins across departments); older ones are mostly done"""
+    department_names = {department["id"]: department["name"] for department in departments}
+    members = {}
+    for user in users:
+        members.setdefault(user["department_id"], []).append(user)
+    hods = [user for user in users if user["role"] == UserRole.HOD]
+    admins = [user for user in users if user["role"] == UserRole.SUPER_ADMIN]
+
+    tasks, assignees = [], []
+    for _ in range(count):
+        assigner = rng.choice(admins) if admins and rng.random() < 0.25 else rng.choice(hods)
+        department_id = assigner["department_id"] if assigner["role"] == UserRole.HOD else rng.choice(departments)["id"]
+        created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+        age = (now - created_at).total_seconds() / (days * 86400)
+        roll = rng.random()
+        if roll < 0.85 * age:
+            status = TaskStatus.DONE
+        elif roll < 0.85 * age + 0.3:
+            status = TaskStatus.IN_PROGRESS
+        else:
+            status = TaskStatus.TODO
+        updated_at = created_at + (now - created_at) * rng.random() if status != TaskStatus.TODO else created_at
+
+        task_id = seeded_uuid(rng)
+        department = department_names[department_id]
+        tasks.append({
+            "id": task_id,
+            "title": f"{rng.choice(VERBS)} {rng.choice(NOUNS)}",
+            "description": sentence(rng, department) if rng.random() < 0.8 else None,
+            "status": status,
+            "priority": rng.choices(*PRIORITIES)[0],
+            "due_date": created_at + timedelta(days=rng.randint(1, 30)) if rng.random() < 0.9 else None,
+            "assigner_id": assigner["id"],
+            "created_at": created_at,
+            "updated_at": updated_at,
+        })
+        candidates = members.get(department_id) or users
+        picked = rng.sample(candidates, min(rng.choices(*ASSIGNEE_COUNTS)[0], len(candidates)))
+        assignees.extend(
+            {"id": seeded_uuid(rng), "task_id": task_id, "assignee_id": user["id"], "assigned_at": created_at}
+            for user in picked
+        )
+    return tasks, assignees
+
+
+def generate_task_logs(rng, departments, users, days, today):
+    """Back-to-back work blocks from 09:00 on ~70% of working days, 15 minutes to 4 hours each"""
+    department_names = {department["id"]: department["name"] for department in departments}
+    for day in working_days(days, today):
+        for user in users:
+            if user["role"] == UserRole.SUPER_ADMIN or rng.random() >= 0.7:
+                continue
+            start = datetime.combine(day, time(9)) + timedelta(minutes=rng.randint(0, 45))
+            for _ in range(rng.choices(*LOGS_PER_DAY)[0]):
+                minutes = int(min(240, max(15, rng.lognormvariate(4.1, 0.5))))
+                end = start + timedelta(minutes=minutes)
+                yield {
+                    "id": seeded_uuid(rng),
+                    "description": sentence(rng, department_names[user["department_id"]]),
+                    "date": day,
+                    "start_time": start,
+                    "end_time": end,
+                    "duration_minutes": minutes,
+                    "user_id": user["id"],
+                    "created_at": end,
+                }
+                start = end + timedelta(minutes=rng.randint(0, 30))
+
+
+def generate_attendance(rng, users, days, today):
+    """~93% presence on working days, check-in around 09:10 and about 8.5 hours at work; a few forgotten check-outs"""
+    for day in working_days(days, today):
+        for user in users:
+            if rng.random() >= 0.93:
+                continue
+            check_in = datetime.combine(day, time(9)) + timedelta(minutes=max(-60, rng.gauss(10, 20)))
+            check_out = check_in + timedelta(hours=max(2, rng.gauss(8.5, 0.75)))
+            if day == today or rng.random() < 0.03:
+                check_out = None
+            yield {
+                "id": seeded_uuid(rng),
+                "user_id": user["id"],
+                "date": day,
+                "check_in": check_in,
+                "check_out": check_out,
+                "created_at": check_in,
+                "updated_at": check_out or check_in,
+            }
+
+
+def generate_wfh_requests(rng, users, days, today):
+    """About one request per employee per two months; decided by the department HOD unless still recent"""
+    hods = {user["department_id"]: user for user in users if user["role"] == UserRole.HOD}
+    for user in users:
+        if user["role"] != UserRole.EMPLOYEE:
+            continue
+        for _ in range(sum(rng.random() < 0.25 for _ in range(max(1, days // 15)))):
+            age = timedelta(seconds=rng.randrange(days * 86400 + 1))
+            created_at = datetime.combine(today, time(12)) - age
+            start_date = created_at.date() + timedelta(days=rng.randint(1, 14))
+            if age.days < 3 and rng.random() < 0.7:
+                status = WFHStatus.PENDING
+            else:
+                status = rng.choices([WFHStatus.APPROVED, WFHStatus.REJECTED, WFHStatus.PENDING], [75, 15, 10])[0]
+            approver = hods.get(user["department_id"])
+            decided = status != WFHStatus.PENDING and approver is not None
+            yield {
+                "id": seeded_uuid(rng),
+                "user_id": user["id"],
+                "reason": rng.choice(WFH_REASONS),
+                "start_date": start_date,
+                "end_date": start_date + timedelta(days=rng.choices([0, 1, 2, 4], [60, 25, 10, 5])[0]),
+                "status": status,
+                "approved_by": approver["id"] if decided else None,
+                "approved_at": created_at + timedelta(hours=rng.randint(1, 48)) if decided else None,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+
+def write(model, rows):
+    """Insert rows in IMPORT_BATCH_SIZE batches, one transaction each; returns the row count"""
+    written = 0
+    for batch in batched(rows, IMPORT_BATCH_SIZE):
+        with engine.begin() as connection:
+            bulk_insert(connection, model, batch)
+        written += len(batch)
+    return written
+
+
+def generate(departments: int, users: int, tasks: int, days: int, seed: int):
+    with engine.connect() as connection:
+        existing = connection.scalar(
+            select(func.count()).select_from(User).where(User.email.like(f"%@{GENERATED_DOMAIN}"))
+        )
+    if existing:
+        raise SystemExit(f"{existing} generated users already exist; use a fresh database")
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    today = now.date()
+
+    department_rows = generate_departments(rng, departments)
+    # Every account shares one hash: bcrypt per user would dominate generation time
+    user_rows = generate_users(rng, department_rows, users, hash_password_sync(GENERATED_PASSWORD))
+    task_rows, assignee_rows = generate_tasks(rng, department_rows, user_rows, tasks, days, now)
+
+    counts = {
+        "departments": write(Department, department_rows),
+        "users": write(User, user_rows),
+        "tasks": write(Task, task_rows),
+        "task assignees": write(TaskAssignee, assignee_rows),
+        "task logs": write(TaskLog, generate_task_logs(rng, department_rows, user_rows, days, today)),
+        "attendance rows": write(Attendance, generate_attendance(rng, user_rows, days, today)),
+        "WFH requests": write(WFHRequest, generate_wfh_requests(rng, user_rows, days, today)),
+    }
+    rebuild_task_log_totals()
+    # Planner statistics, as autovacuum / a long-running database would have them
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic TaskFlow dataset")
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=60, help="history length for tasks, logs, attendance and WFH")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if args.users < args.departments + 1:
+        parser.error("--users must cover one HOD per department plus an admin")
+
+    # Migrations only: the demo seed users are not part of a generated dataset
+    init_db(seed=False)
+    started_at = datetime.utcnow()
+    counts = generate(args.departments, args.users, args.tasks, args.days, args.seed)
+    elapsed = (datetime.utcnow() - started_at).total_seconds()
+    print(", ".join(f"{count} {name}" for name, count in counts.items()) + f" generated in {elapsed:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Bulk import of users, tasks and task logs from CSV or NDJSON
+
+    python -m backend.imports users people.csv
+    python -m backend.imports tasks tasks.ndjson --assigner hod@company.com
+    python -m backend.imports task-logs logs.csv
+
+Rows are validated and written in batches of IMPORT_BATCH_SIZE, one
+transaction per batch. Invalid rows are skipped and reported with their
+row number; the rest of the batch is still imported.
+"""
+import argparse
+import csv
+import enum
+import io
+import json
+import os
+import uuid
+from datetime import datetime
+from itertools import islice
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .database import engine
+from .memberships import evict_departments
+from .models import Department, Task, TaskAssignee, TaskLog, TaskLogDailyTotal, User
+from .passwords import BCRYPT_ROUNDS, bulk_hash_pool, hash_password_sync
+from .schemas import ImportReport, ImportRowError, TaskImport, TaskLogImport, UserImport
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+# Row errors listed in the report; failures past this are only counted
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+
+def read_rows(lines, import_format: str):
+    """Yield (row number, dict or error message) for every data row"""
+    if import_format == "csv":
+        for number, row in enumerate(csv.DictReader(lines), start=1):
+            # Empty cells mean "not given", so optional fields fall back to their defaults
+            yield number, {key: value for key, value in row.items() if key and value not in ("", None)}
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, f"invalid JSON: {exc}"
+            continue
+        yield number, row if isinstance(row, dict) else "expected a JSON object"
+
+
+def batched(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy persists enums by name
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+
+def bulk_insert(connection, model, rows):
+    """Multi-row INSERT, or COPY FROM STDIN when talking to Postgres through psycopg2"""
+    if not rows:
+        return
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+        finally:
+            cursor.close()
+    else:
+        connection.execute(model.__table__.insert(), rows)
+
+
+def user_ids_by_email(connection, emails):
+    if not emails:
+        return {}
+    return dict(connection.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+
+
+def import_users(connection, rows, context):
+    errors = []
+    existing = set(user_ids_by_email(connection, {user.email for _, user in rows}))
+    accepted = []
+    for number, user in rows:
+        if user.email in existing or user.email in context["seen_emails"]:
+            errors.append((number, f"email already registered: {user.email}"))
+            continue
+        department_id = None
+        if user.department:
+            department_id = context["departments"].get(user.department)
+            if department_id is None:
+                errors.append((number, f"unknown department: {user.department}"))
+                continue
+        context["seen_emails"].add(user.email)
+        accepted.append((user, department_id))
+
+    # bcrypt dominates an import; spread the batch over every core
+    hashes = context["hash_pool"].map(
+        hash_password_sync, [user.password for user, _ in accepted], [BCRYPT_ROUNDS] * len(accepted)
+    )
+    now = datetime.utcnow()
+    bulk_insert(connection, User, [
+        {
+            "id": uuid.uuid4(),
+            "name": user.name,
+            "email": user.email,
+            "password": hashed_password,
+            "role": user.role,
+            "department_id": department_id,
+            "avatar_url": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        for (user, department_id), hashed_password in zip(accepted, hashes)
+    ])
+    return len(accepted), errors
+
+
+def import_tasks(connection, rows, context):
+    errors = []
+    emails = set()
+    for _, task in rows:
+        emails.update(task.assigneeEmails)
+        if task.assignerEmail:
+            emails.add(task.assignerEmail)
+    ids = user_ids_by_email(connection, emails)
+
+    now = datetime.utcnow()
+    task_rows = []
+    assignee_rows = []
+    for number, task in rows:
+        assigner_id = ids.get(task.assignerEmail) if task.assignerEmail else context["assigner_id"]
+        if assigner_id is None:
+            errors.append((number, f"unknown assigner: {task.assignerEmail}" if task.assignerEmail else "assignerEmail is required"))
+            continue
+        unknown = [email for email in task.assigneeEmails if email not in ids]
+        if unknown:
+            errors.append((number, f"unknown assignees: {', '.join(unknown)}"))
+            continue
+
+        task_id = uuid.uuid4()
+        task_rows.append({
+            "id": task_id,
+            "title": task.title,
+            "description": task.description,
+            "status": task.status,
+            "priority": task.priority,
+            "due_date": task.dueDate,
+            "assigner_id": assigner_id,
+            "created_at": now,
+            "updated_at": now
+        })
+        assignee_rows.extend(
+            {"id": uuid.uuid4(), "task_id": task_id, "assignee_id": ids[email], "assigned_at": now}
+            for email in dict.fromkeys(task.assigneeEmails)
+        )
+
+    bulk_insert(connection, Task, task_rows)
+    bulk_insert(connection, TaskAssignee, assignee_rows)
+    return len(task_rows), errors
+
+
+def import_task_logs(connection, rows, context):
+    errors = []
+    ids = user_ids_by_email(connection, {log.userEmail for _, log in rows})
+
+    now = datetime.utcnow()
+    log_rows = []
+    totals = {}
+    for number, log in rows:
+        user_id = ids.get(log.userEmail)
+        if user_id is None:
+            errors.append((number, f"unknown user: {log.userEmail}"))
+            continue
+        log_rows.append({
+            "id": uuid.uuid4(),
+            "description": log.description,
+            "date": log.date,
+            "start_time": log.startTime,
+            "end_time": log.endTime,
+            "duration_minutes": log.durationMinutes,
+            "user_id": user_id,
+            "created_at": now
+        })
+        minutes, count = totals.get((user_id, log.date), (0, 0))
+        totals[(user_id, log.date)] = (minutes + (log.durationMinutes or 0), count + 1)
+
+    bulk_insert(connection, TaskLog, log_rows)
+
+    # Same rollup maintenance as create_task_log, one row per user and day of the batch
+    if totals:
+        dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+        rollup = dialect.insert(TaskLogDailyTotal)
+        connection.execute(
+            rollup.on_conflict_do_update(
+                index_elements=[TaskLogDailyTotal.user_id, TaskLogDailyTotal.date],
+                set_={
+                    "minutes": TaskLogDailyTotal.minutes + rollup.excluded.minutes,
+                    "log_count": TaskLogDailyTotal.log_count + rollup.excluded.log_count
+                }
+            ),
+            [
+                {"user_id": user_id, "date": day, "minutes": minutes, "log_count": count}
+                for (user_id, day), (minutes, count) in totals.items()
+            ]
+        )
+    return len(log_rows), errors
+
+
+IMPORTERS = {
+    "users": (UserImport, import_users),
+    "tasks": (TaskImport, import_tasks),
+    "task-logs": (TaskLogImport, import_task_logs),
+}
+
+
+def run_import(kind: str, lines, import_format: str, assigner_id=None) -> ImportReport:
+    """
+    Import every row of `lines` (an iterable of text lines). `assigner_id`
+    is used for task rows without an assignerEmail.
+    """
+    schema, importer = IMPORTERS[kind]
+    report = ImportReport()
+
+    def fail(number, messages):
+        report.failed += 1
+        if len(report.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            report.errors.append(ImportRowError(row=number, errors=messages))
+
+    with engine.connect() as connection:
+        departments = connection.execute(select(Department.id, Department.name)).all()
+    context = {
+        "assigner_id": assigner_id,
+        "seen_emails": set(),
+        # Users may name their department or give its id
+        "departments": {
+            **{name: department_id for department_id, name in departments},
+            **{str(department_id): department_id for department_id, _ in departments}
+        },
+    }
+
+    with bulk_hash_pool() as pool:
+        context["hash_pool"] = pool
+        for batch in batched(read_rows(lines, import_format), IMPORT_BATCH_SIZE):
+            valid = []
+            for number, raw in batch:
+                if isinstance(raw, str):
+                    fail(number, [raw])
+                    continue
+                try:
+                    valid.append((number, schema.model_validate(raw)))
+                except ValidationError as exc:
+                    fail(number, [
+                        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                        for error in exc.errors()
+                    ])
+
+            with engine.begin() as connection:
+                imported, errors = importer(connection, valid, context)
+            if kind == "users":
+                # Core inserts bypass the ORM events that keep the department caches current
+                evict_departments(context["departments"].values())
+            report.imported += imported
+            for number, message in errors:
+                fail(number, [message])
+
+    report.errors.sort(key=lambda error: error.row)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users, tasks or task logs")
+    parser.add_argument("kind", choices=list(IMPORTERS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="defaults to the file extension")
+    parser.add_argument("--assigner", help="email of the assigner for task rows without assignerEmail")
+    args = parser.parse_args()
+
+    import_format = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    assigner_id = None
+    if args.assigner:
+        with engine.connect() as connection:
+            assigner_id = user_ids_by_email(connection, {args.assigner}).get(args.assigner)
+        if assigner_id is None:
+            parser.error(f"unknown assigner: {args.assigner}")
+
+    started_at = datetime.utcnow()
+    with open(args.path, newline="", encoding="utf-8-sig") as lines:
+        report = run_import(args.kind, lines, import_format, assigner_id)
+
+    for error in report.errors:
+        print(f"row {error.row}: {'; '.join(error.errors)}")
+    elapsed = (datetime.utcnow() - started_at).total_seconds()
+    print(f"Imported {report.imported} {args.kind}, {report.failed} failed, in {elapsed:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
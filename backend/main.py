@@ -1,17 +1,40 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy import Date, Time, case, cast, func, insert, literal_column, select, true, type_coerce, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Literal, Optional
 import jwt
-from datetime import datetime, timedelta
-import bcrypt
+from datetime import date, datetime, time, timedelta
+import base64
+import asyncio
+import hashlib
+import io
+import json
 import os
+import re
+import uuid
 from pathlib import Path
 
-from .database import get_db, init_db
+from .database import (
+    LAST_WRITE_COOKIE, ReplicaSessionLocal, async_engine, get_db, pool_status, replica_engine, replica_router,
+    wrote_recently
+)
+from .events import Event, broker
+from .exports import EXPORT_MEDIA_TYPES, stream_export
+from .imports import run_import
+from .memberships import cached_department_member_ids, department_member_ids, department_users
+from .metrics import MetricsMiddleware, render_metrics
+from .principals import Principal, principal_cache
+from .passwords import PasswordHashQueueFull, hash_password, needs_rehash, verify_password
+from .search import task_hits, task_log_hits
+from .static import StaticAssets
+from .serialization import TASK_FIELDS, TASK_LOG_FIELDS, WFH_FIELDS, fast_json, project, select_fields
 from .models import *
 from .schemas import *
 
@@ -19,7 +42,8 @@ from .schemas import *
 app = FastAPI(
     title="TaskFlow API",
     description="Office Task Management System",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # ✅ CORS configuration (single definition)
@@ -29,27 +53,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Negotiated gzip for API responses; precompressed assets and SSE pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+# Outermost: per-route latency, status and DB cost for /metrics, plus Server-Timing headers
+app.add_middleware(MetricsMiddleware)
+
 security = HTTPBearer()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
-
-# ✅ Serve frontend files
 frontend_path = Path(__file__).parent.parent / "frontend"
-if frontend_path.exists():
-    app.mount("/static", StaticFiles(directory=str(frontend_path)), name="static")
+static_assets = StaticAssets(frontend_path)
 
-    @app.get("/{full_path:path}")
-    async def serve_frontend(full_path: str):
-        """
-        Serve index.html for all non-API routes (SPA fallback).
-        This allows frontend routing like /dashboard, /tasks, etc.
-        """
-        potential_file = frontend_path / full_path
-        if potential_file.is_file():
-            return FileResponse(str(potential_file))
-        return FileResponse(str(frontend_path / "index.html"))
+# Task list pagination
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Largest batch accepted by the bulk task endpoints
+BULK_MAX_ITEMS = 1000
+# Task ids per tasks.bulk event, so each fits a Postgres NOTIFY payload
+BULK_EVENT_MAX_IDS = 100
+
+# HOD scoping inlines cached department member ids up to this many; larger
+# departments use a users subquery so statements stay small and plans reusable
+DEPARTMENT_INLINE_MAX = 100
+
+# Delta sync re-reads this many seconds before the cursor to catch late commits
+CHANGES_OVERLAP_SECONDS = 5
+
+# Attendance report: check-ins after this UTC time of day count as late
+ATTENDANCE_LATE_AFTER = time.fromisoformat(os.getenv("ATTENDANCE_LATE_AFTER", "09:30"))
+
+# Longest date range accepted by the attendance and timesheet reports
+REPORT_MAX_DAYS = 366
 
 # --- Authentication Dependency, Utility Functions, Routes (unchanged) ---
 # (Paste your existing authentication, task, attendance, WFH routes here)
@@ -57,21 +96,54 @@ if frontend_path.exists():
 
 # Authentication dependency
 async def get_current_user(
+    response: Response,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
+):
+    principal = await authenticate(credentials.credentials, db)
+    # Commits on this request's session set the last-write cookie (see get_read_db)
+    db.info["response"] = response
+    if principal.role == "HOD" and principal.department_id is not None:
+        # Warm the membership cache the HOD scope filters read from
+        await department_member_ids(db, principal.department_id)
+    return principal
+
+async def get_read_db(
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
+    """
+    Session for read-only routes: the replica when one is configured, current
+    enough and the client has not written recently (its last-write cookie);
+    otherwise the primary session of the request.
+    """
+    if not replica_router.use_replica(wrote_recently(request.cookies.get(LAST_WRITE_COOKIE))):
+        yield db
+        return
+    async with ReplicaSessionLocal() as replica_db:
+        yield replica_db
+
+async def authenticate(token: str, db: AsyncSession) -> Principal:
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-    except jwt.PyJWTError:
+        user_id = uuid.UUID(user_id)
+    except (jwt.PyJWTError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-    return user
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = await db.scalar(
+            select(User).options(joinedload(User.department)).where(User.id == user_id)
+        )
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+    return principal
 
 # Utility functions
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -84,30 +156,331 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+def encode_cursor(created_at: datetime, row_id) -> str:
+    """Opaque keyset cursor pointing at the last row of a page"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def task_load_options():
+    """Eager-load assignees and their names so task responses need no lazy loads"""
+    return selectinload(Task.assignees).joinedload(TaskAssignee.assignee)
+
+async def load_task(db: AsyncSession, task_id):
+    return await db.scalar(
+        select(Task)
+        .options(task_load_options())
+        .where(Task.id == task_id)
+        .execution_options(populate_existing=True)
+    )
+
+def department_user_ids(current_user: Principal):
+    """The HOD's department members: cached ids of a small department, otherwise a users subquery"""
+    members = cached_department_member_ids(current_user.department_id)
+    if members is not None and len(members) <= DEPARTMENT_INLINE_MAX:
+        return list(members)
+    return select(User.id).where(User.department_id == current_user.department_id)
+
+def scoped_tasks_query(current_user: Principal):
+    """Tasks visible to the current user according to their role"""
+    if current_user.role == "Employee":
+        # Employee sees only their assigned tasks
+        return select(Task).where(
+            Task.assignees.any(TaskAssignee.assignee_id == current_user.id)
+        )
+    elif current_user.role == "HOD":
+        # HOD sees tasks assigned to department members and tasks they created
+        return select(Task).where(
+            (Task.assigner_id == current_user.id) |
+            (Task.assignees.any(TaskAssignee.assignee_id.in_(department_user_ids(current_user))))
+        )
+    else:  # Super Admin
+        # Super Admin sees all tasks
+        return select(Task)
+
+# Password hashing backlog is full - ask the client to retry instead of queueing forever
+@app.exception_handler(PasswordHashQueueFull)
+async def password_hash_queue_full_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
+def task_response(task: Task) -> TaskResponse:
+    return TaskResponse(
+        id=str(task.id),
+        title=task.title,
+        description=task.description,
+        status=task.status,
+        priority=task.priority,
+        dueDate=task.due_date.isoformat() if task.due_date else None,
+        assignerId=str(task.assigner_id),
+        assignees=[
+            TaskAssigneeResponse(
+                assigneeId=str(ta.assignee_id),
+                assigneeName=ta.assignee.name
+            )
+            for ta in task.assignees
+        ],
+        createdAt=task.created_at.isoformat(),
+        updatedAt=task.updated_at.isoformat()
+    )
+
+def task_log_response(log: TaskLog) -> TaskLogResponse:
+    return TaskLogResponse(
+        id=str(log.id),
+        description=log.description,
+        date=log.date.isoformat(),
+        startTime=log.start_time.isoformat() if log.start_time else None,
+        endTime=log.end_time.isoformat() if log.end_time else None,
+        durationMinutes=log.duration_minutes,
+        userId=str(log.user_id),
+        createdAt=log.created_at.isoformat()
+    )
+
+def task_event(event_type: str, task: Task) -> Event:
+    # Only the id: subscribers refetch, and the message fits a Postgres NOTIFY whatever the task holds
+    return Event(
+        type=event_type,
+        data={"id": str(task.id)},
+        user_ids={ta.assignee_id for ta in task.assignees},
+        department_ids={ta.assignee.department_id for ta in task.assignees},
+        creator_ids={task.assigner_id}
+    )
+
+def bulk_task_events(action: str, tasks: List[Task]) -> List[Event]:
+    """One tasks.bulk event per BULK_EVENT_MAX_IDS tasks, audience the union of theirs"""
+    events = []
+    for start in range(0, len(tasks), BULK_EVENT_MAX_IDS):
+        batch = tasks[start:start + BULK_EVENT_MAX_IDS]
+        assignments = [ta for task in batch for ta in task.assignees]
+        events.append(Event(
+            type="tasks.bulk",
+            data={"action": action, "ids": [str(task.id) for task in batch]},
+            user_ids={ta.assignee_id for ta in assignments},
+            department_ids={ta.assignee.department_id for ta in assignments},
+            creator_ids={task.assigner_id for task in batch}
+        ))
+    return events
+
+def attendance_event(event_type: str, current_user: Principal, attendance: AttendanceResponse) -> Event:
+    return Event(
+        type=event_type,
+        data={**attendance.model_dump(mode="json"), "userId": str(current_user.id), "userName": current_user.name},
+        user_ids={current_user.id},
+        department_ids={current_user.department_id}
+    )
+
+def upsert_insert(db: AsyncSession, model):
+    """INSERT construct with ON CONFLICT support for the session's dialect"""
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
+
+def worked_seconds(db: AsyncSession):
+    """check_out - check_in in seconds for the session's dialect"""
+    if db.bind.dialect.name == "postgresql":
+        return func.extract("epoch", Attendance.check_out - Attendance.check_in)
+    return (func.julianday(Attendance.check_out) - func.julianday(Attendance.check_in)) * 86400
+
+def checked_in_after(db: AsyncSession, cutoff: time):
+    """True when the check-in time of day is later than cutoff"""
+    if db.bind.dialect.name == "postgresql":
+        return cast(Attendance.check_in, Time) > cutoff
+    return func.time(Attendance.check_in) > cutoff.isoformat()
+
+def period_start(db: AsyncSession, column, period: str):
+    """First day of the week (Monday) or month containing column, as a date"""
+    if db.bind.dialect.name == "postgresql":
+        # Inline the unit: SELECT and GROUP BY must render the identical expression
+        return cast(func.date_trunc(literal_column(f"'{period}'"), column), Date)
+    if period == "week":
+        return type_coerce(func.date(column, "weekday 0", "-6 days"), Date)
+    return type_coerce(func.date(column, "start of month"), Date)
+
+def scoped_report_users(current_user: Principal, department_id: Optional[uuid.UUID] = None):
+    """Users covered by a report; same scoping as the department user list"""
+    users = select(
+        User.id, User.name, User.department_id, Department.name.label("department")
+    ).outerjoin(User.department)
+    if current_user.role == "Employee":
+        return users.where(User.id == current_user.id)
+    elif current_user.role == "HOD":
+        # HOD can only see their department
+        if department_id is not None and department_id != current_user.department_id:
+            raise HTTPException(status_code=403, detail="Can only view your department")
+        return users.where(User.department_id == current_user.department_id)
+    elif department_id is not None:  # Super Admin
+        return users.where(User.department_id == department_id)
+    return users
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def user_scope(current_user: Principal, user_id_column):
+    """Filter for per-user rows (WFH requests, task logs, attendance) the current user may see"""
+    if current_user.role == "Employee":
+        return user_id_column == current_user.id
+    elif current_user.role == "HOD":
+        # HOD sees rows from their department
+        return user_id_column.in_(department_user_ids(current_user))
+    else:  # Super Admin
+        return true()
+
+def department_users_query(department_id: uuid.UUID):
+    """Members of a department with the department name loaded"""
+    return select(User).options(joinedload(User.department)).where(User.department_id == department_id)
+
+def task_logs_query(user_id: uuid.UUID):
+    """One user's task logs"""
+    return select(TaskLog).where(TaskLog.user_id == user_id)
+
+def scoped_wfh_query(current_user: Principal):
+    """WFH requests visible to the current user according to their role"""
+    return select(WFHRequest).where(user_scope(current_user, WFHRequest.user_id))
+
+def string_agg(db: AsyncSession, column, separator: str):
+    """Concatenate the grouped values of column for the session's dialect"""
+    if db.bind.dialect.name == "postgresql":
+        return func.string_agg(column, literal_column(f"'{separator}'"))
+    return func.group_concat(column, separator)
+
+def export_tasks_query(db: AsyncSession, current_user: Principal):
+    assignees = (
+        select(string_agg(db, User.name, "; "))
+        .join(TaskAssignee, TaskAssignee.assignee_id == User.id)
+        .where(TaskAssignee.task_id == Task.id)
+        .scalar_subquery()
+    )
+    return scoped_tasks_query(current_user).with_only_columns(
+        Task.id.label("id"),
+        Task.title.label("title"),
+        Task.description.label("description"),
+        Task.status.label("status"),
+        Task.priority.label("priority"),
+        Task.due_date.label("dueDate"),
+        Task.assigner_id.label("assignerId"),
+        assignees.label("assignees"),
+        Task.created_at.label("createdAt"),
+        Task.updated_at.label("updatedAt")
+    ).order_by(Task.created_at, Task.id)
+
+def export_task_logs_query(db: AsyncSession, current_user: Principal):
+    return select(
+        TaskLog.id.label("id"),
+        TaskLog.user_id.label("userId"),
+        User.name.label("userName"),
+        TaskLog.date.label("date"),
+        TaskLog.description.label("description"),
+        TaskLog.start_time.label("startTime"),
+        TaskLog.end_time.label("endTime"),
+        TaskLog.duration_minutes.label("durationMinutes"),
+        TaskLog.created_at.label("createdAt")
+    ).join(User, User.id == TaskLog.user_id).where(
+        user_scope(current_user, TaskLog.user_id)
+    ).order_by(TaskLog.user_id, TaskLog.date)
+
+def export_attendance_query(db: AsyncSession, current_user: Principal):
+    return select(
+        Attendance.id.label("id"),
+        Attendance.user_id.label("userId"),
+        User.name.label("userName"),
+        Attendance.date.label("date"),
+        Attendance.check_in.label("checkIn"),
+        Attendance.check_out.label("checkOut")
+    ).join(User, User.id == Attendance.user_id).where(
+        user_scope(current_user, Attendance.user_id)
+    ).order_by(Attendance.user_id, Attendance.date)
+
+def export_wfh_query(db: AsyncSession, current_user: Principal):
+    return select(
+        WFHRequest.id.label("id"),
+        WFHRequest.user_id.label("userId"),
+        User.name.label("userName"),
+        WFHRequest.reason.label("reason"),
+        WFHRequest.start_date.label("startDate"),
+        WFHRequest.end_date.label("endDate"),
+        WFHRequest.status.label("status"),
+        WFHRequest.approved_by.label("approvedBy"),
+        WFHRequest.approved_at.label("approvedAt"),
+        WFHRequest.created_at.label("createdAt")
+    ).join(User, User.id == WFHRequest.user_id).where(
+        user_scope(current_user, WFHRequest.user_id)
+    ).order_by(WFHRequest.created_at, WFHRequest.id)
+
+EXPORT_QUERIES = {
+    "tasks": export_tasks_query,
+    "task-logs": export_task_logs_query,
+    "attendance": export_attendance_query,
+    "wfh": export_wfh_query,
+}
+
+async def scope_etag(db: AsyncSession, query, column: str, *parts) -> str:
+    """Weak validator from max(column) and row count over a scoped query"""
+    scope = query.subquery()
+    latest, count = (await db.execute(
+        select(func.max(scope.c[column]), func.count()).select_from(scope)
+    )).one()
+    raw = "|".join(str(part) for part in (latest, count) + parts)
+    return 'W/"' + hashlib.sha1(raw.encode('utf-8')).hexdigest() + '"'
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set the validator headers; return a 304 when the client copy is current"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    init_db()
+    # Schema setup and seeding run once per deploy via `python -m backend.Startall init`
+    await broker.start()
+    if frontend_path.exists():
+        static_assets.load()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await broker.stop()
+    # Close pooled connections so aiosqlite worker threads do not block exit
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+# Liveness probe used by the launcher; touches no database
+@app.get("/api/health")
+async def health():
+    return {"status": "ok"}
+
+# Prometheus scrape target (per worker process)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 # Root endpoint - serve the frontend
 @app.get("/")
-async def root():
-    return FileResponse(str(frontend_path / "index.html"))
+async def root(request: Request):
+    return static_assets.response(request, static_assets.get("index.html"))
 
 # Authentication Routes
 @app.post("/api/auth/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == login_data.email).first()
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(
+        select(User).options(joinedload(User.department)).where(User.email == login_data.email)
+    )
     
-    if not user or not verify_password(login_data.password, user.password):
+    if not user or not await verify_password(login_data.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    # Upgrade the stored hash when the configured bcrypt cost has changed
+    if needs_rehash(user.password):
+        user.password = await hash_password(login_data.password)
+        await db.commit()
+    
     access_token = create_access_token(data={"sub": str(user.id)})
     
     return LoginResponse(
@@ -123,14 +496,14 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     )
 
 @app.post("/api/auth/register", response_model=UserResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash password
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     
     # Create user
     db_user = User(
@@ -142,8 +515,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    db_user = await db.scalar(
+        select(User).options(joinedload(User.department)).where(User.id == db_user.id)
+    )
     
     return UserResponse(
         id=str(db_user.id),
@@ -156,34 +531,38 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 # User Routes
 @app.get("/api/user/profile", response_model=UserResponse)
-async def get_profile(current_user: User = Depends(get_current_user)):
+async def get_profile(current_user: Principal = Depends(get_current_user)):
     return UserResponse(
         id=str(current_user.id),
         name=current_user.name,
         email=current_user.email,
         role=current_user.role,
-        department=current_user.department.name if current_user.department else None,
+        department=current_user.department_name,
         departmentId=str(current_user.department_id) if current_user.department_id else None
     )
 
 # Department Routes
 @app.get("/api/departments/{department_id}/users", response_model=List[UserResponse])
 async def get_department_users(
-    department_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    department_id: uuid.UUID,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Check permission - only HOD and Super Admin can view department users
     if current_user.role not in ["HOD", "Super Admin"]:
         raise HTTPException(status_code=403, detail="Permission denied")
     
     # HOD can only see their department, Super Admin can see any department
-    if current_user.role == "HOD" and str(current_user.department_id) != department_id:
+    if current_user.role == "HOD" and current_user.department_id != department_id:
         raise HTTPException(status_code=403, detail="Can only view your department")
     
-    users = db.query(User).filter(User.department_id == department_id).all()
+    cached = department_users.get(department_id)
+    if cached is not None:
+        return cached
     
-    return [
+    users = (await db.scalars(department_users_query(department_id))).all()
+    
+    result = [
         UserResponse(
             id=str(user.id),
             name=user.name,
@@ -194,60 +573,141 @@ async def get_department_users(
         )
         for user in users
     ]
+    department_users.set(department_id, result)
+    return result
 
 # Task Routes
 @app.get("/api/tasks", response_model=List[TaskResponse])
 async def get_tasks(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    assignee_id: Optional[uuid.UUID] = None,
+    assigner_id: Optional[uuid.UUID] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
+    getters = select_fields(fields, TASK_FIELDS)
+    
     # Get tasks based on user role
+    query = scoped_tasks_query(current_user)
+
+    # Server-side filters
+    if status is not None:
+        query = query.where(Task.status == status)
+    if priority is not None:
+        query = query.where(Task.priority == priority)
+    if assignee_id is not None:
+        query = query.where(Task.assignees.any(TaskAssignee.assignee_id == assignee_id))
+    if assigner_id is not None:
+        query = query.where(Task.assigner_id == assigner_id)
+    if due_from is not None:
+        query = query.where(Task.due_date >= due_from)
+    if due_to is not None:
+        query = query.where(Task.due_date <= due_to)
+
+    # Conditional GET: the validator covers the whole filtered scope and this page's parameters
+    etag = await scope_etag(db, query, "updated_at", current_user.id, request.url.query)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    # Keyset pagination, newest first
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            (Task.created_at < cursor_created_at) |
+            ((Task.created_at == cursor_created_at) & (Task.id < cursor_id))
+        )
+
+    if "assignees" in getters:
+        query = query.options(task_load_options())
+    tasks = (await db.scalars(
+        query.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
+    )).all()
+
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(tasks[-1].created_at, tasks[-1].id)
+    
+    return fast_json(project(tasks, getters), response)
+
+@app.get("/api/tasks/changes", response_model=TaskChangesResponse)
+async def get_task_changes(
+    response: Response,
+    since: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Tasks created, updated, (re)assigned or whose assignee moved department
+    since the cursor, plus tombstones for tasks that were deleted or left the
+    caller's scope (unassigned, or their assignee moved department). Call
+    without `since` to obtain a starting cursor before the initial full load.
+    Cursors older than the tombstone retention get 410 and the client reloads
+    everything.
+    """
+    getters = select_fields(fields, TASK_FIELDS)
+    now = datetime.utcnow()
+    next_cursor = base64.urlsafe_b64encode(now.isoformat().encode('utf-8')).decode('ascii')
+    if not since:
+        return TaskChangesResponse(tasks=[], removedTaskIds=[], cursor=next_cursor)
+
+    try:
+        since_at = datetime.fromisoformat(base64.urlsafe_b64decode(since.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if since_at < tombstone_cutoff():
+        # Tombstones this old are pruned, so removals could be missed: the client reloads everything
+        raise HTTPException(status_code=410, detail="Cursor expired, reload all tasks")
+    since_at -= timedelta(seconds=CHANGES_OVERLAP_SECONDS)
+
+    scope = scoped_tasks_query(current_user)
+    changed = scope.options(task_load_options()) if "assignees" in getters else scope
+    tasks = (await db.scalars(
+        changed.where(
+            (Task.updated_at > since_at) |
+            Task.assignees.any(TaskAssignee.assigned_at > since_at)
+        ).order_by(Task.updated_at)
+    )).all()
+
+    # Tombstones the caller may hold a copy of and that are not visible any more
+    tombstones = select(TaskTombstone.task_id).where(
+        TaskTombstone.created_at > since_at,
+        TaskTombstone.task_id.not_in(scope.with_only_columns(Task.id))
+    )
     if current_user.role == "Employee":
-        # Employee sees only their assigned tasks
-        tasks = db.query(Task).join(TaskAssignee).filter(
-            TaskAssignee.assignee_id == current_user.id
-        ).all()
+        tombstones = tombstones.where(
+            TaskTombstone.assignee_id.is_(None) | (TaskTombstone.assignee_id == current_user.id)
+        )
     elif current_user.role == "HOD":
-        # HOD sees tasks assigned to department members and tasks they created
-        department_user_ids = db.query(User.id).filter(
-            User.department_id == current_user.department_id
-        ).subquery()
-        
-        tasks = db.query(Task).filter(
-            (Task.assigner_id == current_user.id) |
-            (Task.assignees.any(TaskAssignee.assignee_id.in_(department_user_ids)))
-        ).all()
-    else:  # Super Admin
-        # Super Admin sees all tasks
-        tasks = db.query(Task).all()
-    
-    return [
-        TaskResponse(
-            id=str(task.id),
-            title=task.title,
-            description=task.description,
-            status=task.status,
-            priority=task.priority,
-            dueDate=task.due_date.isoformat() if task.due_date else None,
-            assignerId=str(task.assigner_id),
-            assignees=[
-                TaskAssigneeResponse(
-                    assigneeId=str(ta.assignee_id),
-                    assigneeName=ta.assignee.name
-                )
-                for ta in task.assignees
-            ],
-            createdAt=task.created_at.isoformat(),
-            updatedAt=task.updated_at.isoformat()
+        tombstones = tombstones.where(
+            TaskTombstone.assignee_id.is_(None) |
+            (TaskTombstone.department_id == current_user.department_id) |
+            TaskTombstone.assignee_id.in_(
+                select(User.id).where(User.department_id == current_user.department_id)
+            )
         )
-        for task in tasks
-    ]
+    removed_ids = (await db.scalars(tombstones.distinct())).all()
+
+    return fast_json({
+        "tasks": project(tasks, getters),
+        "removedTaskIds": removed_ids,
+        "cursor": next_cursor
+    }, response)
 
 @app.post("/api/tasks", response_model=TaskResponse)
 async def create_task(
     task_data: TaskCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     # Only HOD and Super Admin can create tasks
     if current_user.role == "Employee":
@@ -264,8 +724,7 @@ async def create_task(
     )
     
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
     
     # Add assignees
     for assignee_id in task_data.assigneeIds:
@@ -275,36 +734,128 @@ async def create_task(
         )
         db.add(db_assignment)
     
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    db_task = await load_task(db, db_task.id)
+    await broker.publish(task_event("task.created", db_task))
     
-    return TaskResponse(
-        id=str(db_task.id),
-        title=db_task.title,
-        description=db_task.description,
-        status=db_task.status,
-        priority=db_task.priority,
-        dueDate=db_task.due_date.isoformat() if db_task.due_date else None,
-        assignerId=str(db_task.assigner_id),
-        assignees=[
-            TaskAssigneeResponse(
-                assigneeId=str(ta.assignee_id),
-                assigneeName=ta.assignee.name
+    return task_response(db_task)
+
+@app.post("/api/tasks/bulk", response_model=List[TaskResponse])
+async def bulk_create_tasks(
+    bulk_data: TaskBulkCreate,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Only HOD and Super Admin can create tasks
+    if current_user.role == "Employee":
+        raise HTTPException(status_code=403, detail="Employees cannot create tasks")
+    if len(bulk_data.tasks) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} tasks per request")
+    
+    # Validate every assignee id with one query
+    assignee_ids = {assignee_id for task_data in bulk_data.tasks for assignee_id in task_data.assigneeIds}
+    known_ids = set((await db.scalars(select(User.id).where(User.id.in_(assignee_ids)))).all())
+    unknown_ids = assignee_ids - known_ids
+    if unknown_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown assignee ids: {', '.join(sorted(str(i) for i in unknown_ids))}"
+        )
+    
+    # Ids are generated here so tasks and assignments go out as two multi-row INSERTs
+    now = datetime.utcnow()
+    task_rows = []
+    assignee_rows = []
+    for task_data in bulk_data.tasks:
+        task_id = uuid.uuid4()
+        task_rows.append({
+            "id": task_id,
+            "title": task_data.title,
+            "description": task_data.description,
+            "priority": task_data.priority,
+            "due_date": task_data.dueDate,
+            "assigner_id": current_user.id,
+            "status": TaskStatus.TODO,
+            "created_at": now,
+            "updated_at": now
+        })
+        assignee_rows.extend(
+            {"id": uuid.uuid4(), "task_id": task_id, "assignee_id": assignee_id, "assigned_at": now}
+            for assignee_id in dict.fromkeys(task_data.assigneeIds)
+        )
+    
+    if task_rows:
+        await db.execute(insert(Task), task_rows)
+    if assignee_rows:
+        await db.execute(insert(TaskAssignee), assignee_rows)
+    await db.commit()
+    
+    task_ids = [row["id"] for row in task_rows]
+    tasks = (await db.scalars(
+        select(Task).options(task_load_options()).where(Task.id.in_(task_ids))
+    )).all()
+    tasks_by_id = {task.id: task for task in tasks}
+    tasks = [tasks_by_id[task_id] for task_id in task_ids]
+    
+    for event in bulk_task_events("created", tasks):
+        await broker.publish(event)
+    
+    return [task_response(task) for task in tasks]
+
+@app.patch("/api/tasks/bulk", response_model=List[TaskResponse])
+async def bulk_update_task_status(
+    bulk_update: TaskBulkStatusUpdate,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    task_ids = set(bulk_update.taskIds)
+    if len(task_ids) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} tasks per request")
+    
+    existing_ids = set((await db.scalars(select(Task.id).where(Task.id.in_(task_ids)))).all())
+    if existing_ids != task_ids:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    # Check permission for the whole batch in one query: assignee, assigner or admin
+    if current_user.role != "Super Admin":
+        allowed_ids = set((await db.scalars(
+            select(Task.id).where(
+                Task.id.in_(task_ids),
+                (Task.assigner_id == current_user.id) |
+                Task.assignees.any(TaskAssignee.assignee_id == current_user.id)
             )
-            for ta in db_task.assignees
-        ],
-        createdAt=db_task.created_at.isoformat(),
-        updatedAt=db_task.updated_at.isoformat()
+        )).all())
+        if allowed_ids != task_ids:
+            raise HTTPException(status_code=403, detail="Permission denied")
+    
+    await db.execute(
+        update(Task)
+        .where(Task.id.in_(task_ids))
+        .values(status=bulk_update.status, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
     )
+    await db.commit()
+    
+    tasks = (await db.scalars(
+        select(Task)
+        .options(task_load_options())
+        .where(Task.id.in_(task_ids))
+        .execution_options(populate_existing=True)
+    )).all()
+    
+    for event in bulk_task_events("updated", tasks):
+        await broker.publish(event)
+    
+    return [task_response(task) for task in tasks]
 
 @app.patch("/api/tasks/{task_id}", response_model=TaskResponse)
 async def update_task(
-    task_id: str,
+    task_id: uuid.UUID,
     task_update: TaskUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = await load_task(db, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -330,70 +881,158 @@ async def update_task(
     
     task.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await broker.publish(task_event("task.updated", task))
     
-    return TaskResponse(
-        id=str(task.id),
-        title=task.title,
-        description=task.description,
-        status=task.status,
-        priority=task.priority,
-        dueDate=task.due_date.isoformat() if task.due_date else None,
-        assignerId=str(task.assigner_id),
-        assignees=[
-            TaskAssigneeResponse(
-                assigneeId=str(ta.assignee_id),
-                assigneeName=ta.assignee.name
-            )
-            for ta in task.assignees
-        ],
-        createdAt=task.created_at.isoformat(),
-        updatedAt=task.updated_at.isoformat()
+    return task_response(task)
+
+# Dashboard Routes
+@app.get("/api/dashboard/summary", response_model=DashboardSummaryResponse)
+async def get_dashboard_summary(
+    recent: int = Query(5, ge=0, le=50),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Task counts, overdue count, today's attendance and the newest tasks, aggregated in the database"""
+    scope = scoped_tasks_query(current_user).subquery()
+    
+    by_status = {task_status.value: 0 for task_status in TaskStatus}
+    for task_status, count in (await db.execute(
+        select(scope.c.status, func.count()).group_by(scope.c.status)
+    )).all():
+        by_status[TaskStatus(task_status).value] = count
+    
+    by_priority = {priority.value: 0 for priority in TaskPriority}
+    for priority, count in (await db.execute(
+        select(scope.c.priority, func.count()).group_by(scope.c.priority)
+    )).all():
+        by_priority[TaskPriority(priority).value] = count
+    
+    overdue = await db.scalar(
+        select(func.count()).select_from(scope).where(
+            scope.c.due_date < datetime.utcnow(),
+            scope.c.status != TaskStatus.DONE
+        )
+    )
+    
+    recent_tasks = (await db.scalars(
+        scoped_tasks_query(current_user)
+        .options(task_load_options())
+        .order_by(Task.created_at.desc(), Task.id.desc())
+        .limit(recent)
+    )).all() if recent else []
+    
+    return DashboardSummaryResponse(
+        totalTasks=sum(by_status.values()),
+        tasksByStatus=by_status,
+        tasksByPriority=by_priority,
+        overdueTasks=overdue,
+        attendance=await attendance_status(db, current_user.id),
+        recentTasks=[task_response(task) for task in recent_tasks]
     )
 
 # Task Log Routes
+@app.get("/api/task-logs/totals", response_model=List[TaskLogTotalResponse])
+async def get_task_log_totals(
+    period: Literal["week", "month"] = "week",
+    group_by: Literal["user", "department"] = "user",
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    user_id: Optional[uuid.UUID] = None,
+    department_id: Optional[uuid.UUID] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Weekly or monthly logged minutes per user or department, read from the daily rollup"""
+    to_date = to_date or datetime.utcnow().date()
+    if from_date is None:
+        # Default to the last 12 weeks, or the last 12 months including this one
+        if period == "week":
+            from_date = to_date - timedelta(weeks=12)
+        else:
+            year, month = divmod(to_date.year * 12 + to_date.month - 12, 12)
+            from_date = date(year, month + 1, 1)
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (to_date - from_date).days >= REPORT_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Report range is limited to {REPORT_MAX_DAYS} days")
+    
+    users = scoped_report_users(current_user, department_id)
+    if user_id is not None:
+        users = users.where(User.id == user_id)
+    users = users.subquery()
+    
+    bucket = period_start(db, TaskLogDailyTotal.date, period).label("period_start")
+    if group_by == "user":
+        keys = [users.c.id, users.c.name, users.c.department_id, users.c.department]
+    else:
+        keys = [users.c.department_id, users.c.department]
+    
+    rows = (await db.execute(
+        select(
+            bucket,
+            *keys,
+            func.sum(TaskLogDailyTotal.minutes).label("minutes"),
+            func.sum(TaskLogDailyTotal.log_count).label("log_count")
+        )
+        .select_from(TaskLogDailyTotal)
+        .join(users, users.c.id == TaskLogDailyTotal.user_id)
+        .where(TaskLogDailyTotal.date.between(from_date, to_date))
+        .group_by(bucket, *keys)
+        .order_by(bucket, keys[1])
+    )).mappings().all()
+    
+    return [
+        TaskLogTotalResponse(
+            periodStart=row["period_start"],
+            userId=str(row["id"]) if group_by == "user" else None,
+            userName=row["name"] if group_by == "user" else None,
+            departmentId=str(row["department_id"]) if row["department_id"] else None,
+            department=row["department"],
+            minutes=row["minutes"],
+            logCount=row["log_count"]
+        )
+        for row in rows
+    ]
+
 @app.get("/api/task-logs/{user_id}", response_model=List[TaskLogResponse])
 async def get_task_logs(
-    user_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Check permission
     can_view = (
-        str(current_user.id) == user_id or  # Own logs
+        current_user.id == user_id or  # Own logs
         current_user.role == "Super Admin" or  # Admin can see all
         (current_user.role == "HOD" and  # HOD can see department logs
-         db.query(User).filter(
-             User.id == user_id,
-             User.department_id == current_user.department_id
-         ).first())
+         user_id in await department_member_ids(db, current_user.department_id))
     )
     
     if not can_view:
         raise HTTPException(status_code=403, detail="Permission denied")
     
-    logs = db.query(TaskLog).filter(TaskLog.user_id == user_id).order_by(TaskLog.created_at.desc()).all()
+    getters = select_fields(fields, TASK_LOG_FIELDS)
+    query = task_logs_query(user_id)
+
+    # Logs are never edited, so the newest created_at plus the count identifies the list
+    etag = await scope_etag(db, query, "created_at", request.url.query)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     
-    return [
-        TaskLogResponse(
-            id=str(log.id),
-            description=log.description,
-            date=log.date.isoformat(),
-            startTime=log.start_time.isoformat() if log.start_time else None,
-            endTime=log.end_time.isoformat() if log.end_time else None,
-            durationMinutes=log.duration_minutes,
-            userId=str(log.user_id),
-            createdAt=log.created_at.isoformat()
-        )
-        for log in logs
-    ]
+    logs = (await db.scalars(query.order_by(TaskLog.created_at.desc()))).all()
+    
+    return fast_json(project(logs, getters), response)
 
 @app.post("/api/task-logs", response_model=TaskLogResponse)
 async def create_task_log(
     log_data: TaskLogCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     db_log = TaskLog(
         description=log_data.description,
@@ -405,31 +1044,39 @@ async def create_task_log(
     )
     
     db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
     
-    return TaskLogResponse(
-        id=str(db_log.id),
-        description=db_log.description,
-        date=db_log.date.isoformat(),
-        startTime=db_log.start_time.isoformat() if db_log.start_time else None,
-        endTime=db_log.end_time.isoformat() if db_log.end_time else None,
-        durationMinutes=db_log.duration_minutes,
-        userId=str(db_log.user_id),
-        createdAt=db_log.created_at.isoformat()
+    # Keep the daily rollup in the same transaction as the log
+    rollup = upsert_insert(db, TaskLogDailyTotal).values(
+        user_id=current_user.id,
+        date=log_data.date,
+        minutes=log_data.durationMinutes or 0,
+        log_count=1
     )
+    await db.execute(rollup.on_conflict_do_update(
+        index_elements=[TaskLogDailyTotal.user_id, TaskLogDailyTotal.date],
+        set_={
+            "minutes": TaskLogDailyTotal.minutes + rollup.excluded.minutes,
+            "log_count": TaskLogDailyTotal.log_count + 1
+        }
+    ))
+    await db.commit()
+    
+    return task_log_response(db_log)
 
 # Attendance Routes
 @app.get("/api/attendance/status", response_model=AttendanceStatusResponse)
 async def get_attendance_status(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
+    return await attendance_status(db, current_user.id)
+
+async def attendance_status(db: AsyncSession, user_id) -> AttendanceStatusResponse:
     today = datetime.utcnow().date()
-    attendance = db.query(Attendance).filter(
-        Attendance.user_id == current_user.id,
+    attendance = await db.scalar(select(Attendance).where(
+        Attendance.user_id == user_id,
         Attendance.date == today
-    ).first()
+    ))
     
     if attendance and attendance.check_in and not attendance.check_out:
         return AttendanceStatusResponse(
@@ -452,113 +1099,321 @@ async def get_attendance_status(
 
 @app.post("/api/attendance/checkin", response_model=AttendanceResponse)
 async def check_in(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     today = datetime.utcnow().date()
     now = datetime.utcnow()
     
-    # Check if already checked in today
-    existing = db.query(Attendance).filter(
-        Attendance.user_id == current_user.id,
-        Attendance.date == today
-    ).first()
+    # One atomic statement: create today's row, or restart a checked-out day.
+    # The unique (user_id, date) constraint makes concurrent check-ins collapse
+    # onto a single row; an open check-in matches no row and returns nothing.
+    stmt = upsert_insert(db, Attendance).values(
+        id=uuid.uuid4(),
+        user_id=current_user.id,
+        date=today,
+        check_in=now,
+        created_at=now,
+        updated_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Attendance.user_id, Attendance.date],
+        set_={"check_in": now, "check_out": None, "updated_at": now},
+        where=(Attendance.check_in.is_(None) | Attendance.check_out.is_not(None))
+    ).returning(Attendance.id, Attendance.check_in, Attendance.date)
     
-    if existing and existing.check_in and not existing.check_out:
+    attendance = (await db.execute(stmt)).first()
+    if attendance is None:
         raise HTTPException(status_code=400, detail="Already checked in today")
+    await db.commit()
     
-    if existing:
-        # Update existing record
-        existing.check_in = now
-        existing.check_out = None
-        db.commit()
-        attendance = existing
-    else:
-        # Create new record
-        attendance = Attendance(
-            user_id=current_user.id,
-            date=today,
-            check_in=now
-        )
-        db.add(attendance)
-        db.commit()
-        db.refresh(attendance)
-    
-    return AttendanceResponse(
+    result = AttendanceResponse(
         id=str(attendance.id),
         checkIn=attendance.check_in.isoformat(),
         checkOut=None,
         date=attendance.date.isoformat()
     )
+    await broker.publish(attendance_event("attendance.checked_in", current_user, result))
+    return result
 
 @app.post("/api/attendance/checkout", response_model=AttendanceResponse)
 async def check_out(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     today = datetime.utcnow().date()
     now = datetime.utcnow()
     
-    attendance = db.query(Attendance).filter(
-        Attendance.user_id == current_user.id,
-        Attendance.date == today
-    ).first()
-    
-    if not attendance or not attendance.check_in:
-        raise HTTPException(status_code=400, detail="Not checked in today")
+    # Close today's open check-in in one statement
+    attendance = (await db.execute(
+        update(Attendance)
+        .where(
+            Attendance.user_id == current_user.id,
+            Attendance.date == today,
+            Attendance.check_in.is_not(None),
+            Attendance.check_out.is_(None)
+        )
+        .values(check_out=now, updated_at=now)
+        .returning(Attendance.id, Attendance.check_in, Attendance.check_out, Attendance.date)
+        .execution_options(synchronize_session=False)
+    )).first()
     
-    if attendance.check_out:
+    if attendance is None:
+        # Only the error path pays for a second query, to pick the right message
+        existing = await db.scalar(select(Attendance).where(
+            Attendance.user_id == current_user.id,
+            Attendance.date == today
+        ))
+        if not existing or not existing.check_in:
+            raise HTTPException(status_code=400, detail="Not checked in today")
         raise HTTPException(status_code=400, detail="Already checked out today")
+    await db.commit()
     
-    attendance.check_out = now
-    db.commit()
-    
-    return AttendanceResponse(
+    result = AttendanceResponse(
         id=str(attendance.id),
         checkIn=attendance.check_in.isoformat(),
         checkOut=attendance.check_out.isoformat(),
         date=attendance.date.isoformat()
     )
+    await broker.publish(attendance_event("attendance.checked_out", current_user, result))
+    return result
+
+@app.get("/api/attendance/report", response_model=AttendanceReportResponse)
+async def get_attendance_report(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    department_id: Optional[uuid.UUID] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Per-user worked hours, days present, late arrivals and missing check-outs, aggregated in the database"""
+    today = datetime.utcnow().date()
+    to_date = to_date or today
+    from_date = from_date or to_date.replace(day=1)
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (to_date - from_date).days >= REPORT_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Report range is limited to {REPORT_MAX_DAYS} days")
+    
+    users = scoped_report_users(current_user, department_id).subquery()
+    
+    completed = Attendance.check_in.is_not(None) & Attendance.check_out.is_not(None)
+    # Today's open check-in is still in progress, not a missing check-out
+    missing_checkout = (
+        Attendance.check_in.is_not(None) & Attendance.check_out.is_(None) & (Attendance.date < today)
+    )
+    rows = (await db.execute(
+        select(
+            users.c.id,
+            users.c.name,
+            users.c.department,
+            func.count(Attendance.check_in),
+            func.coalesce(func.sum(case((completed, worked_seconds(db)), else_=0)), 0),
+            func.count(case((checked_in_after(db, ATTENDANCE_LATE_AFTER), 1))),
+            func.count(case((missing_checkout, 1)))
+        )
+        .select_from(users)
+        .outerjoin(Attendance, (Attendance.user_id == users.c.id) & Attendance.date.between(from_date, to_date))
+        .group_by(users.c.id, users.c.name, users.c.department)
+        .order_by(users.c.name, users.c.id)
+    )).all()
+    
+    return AttendanceReportResponse(
+        fromDate=from_date,
+        toDate=to_date,
+        lateAfter=ATTENDANCE_LATE_AFTER.isoformat(timespec="minutes"),
+        users=[
+            AttendanceReportEntry(
+                userId=str(user_id),
+                userName=name,
+                department=department,
+                daysPresent=days_present,
+                workedHours=round(float(seconds) / 3600, 2),
+                lateArrivals=late,
+                missingCheckouts=missing
+            )
+            for user_id, name, department, days_present, seconds, late, missing in rows
+        ]
+    )
 
 # WFH Routes
 @app.get("/api/wfh", response_model=List[WFHRequestResponse])
 async def get_wfh_requests(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    if current_user.role == "Employee":
-        requests = db.query(WFHRequest).filter(WFHRequest.user_id == current_user.id).all()
-    elif current_user.role == "HOD":
-        # HOD sees requests from their department
-        department_user_ids = db.query(User.id).filter(
-            User.department_id == current_user.department_id
-        ).subquery()
-        requests = db.query(WFHRequest).filter(
-            WFHRequest.user_id.in_(department_user_ids)
-        ).all()
-    else:  # Super Admin
-        requests = db.query(WFHRequest).all()
+    getters = select_fields(fields, WFH_FIELDS)
+    query = scoped_wfh_query(current_user)
+
+    etag = await scope_etag(db, query, "updated_at", current_user.id, request.url.query)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    if "userName" in getters:
+        query = query.options(joinedload(WFHRequest.user))
+    requests = (await db.scalars(query)).all()
+    
+    return fast_json(project(requests, getters), response)
+
+# Event Stream Routes
+@app.get("/api/events")
+async def stream_events(
+    request: Request,
+    token: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Server-Sent Events for task and attendance changes visible to the caller.
+    EventSource cannot send headers, so the JWT comes in the `token` query param.
+    """
+    current_user = await authenticate(token, db)
+    await db.close()  # do not hold a connection for the lifetime of the stream
+    subscription = broker.subscribe(current_user)
+    _, queue = subscription
+
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Search Routes
+@app.get("/api/search", response_model=List[SearchResultResponse])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[Literal["tasks", "logs"]] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ranked full-text matches over tasks and task logs the caller can see, best first"""
+    if not re.search(r"\w", q):
+        return []
+    try:
+        offset = int(base64.urlsafe_b64decode(cursor.encode('ascii'))) if cursor else 0
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Same visibility as get_tasks and get_task_logs
+    dialect = db.bind.dialect.name
+    parts = []
+    if type != "logs":
+        parts.append(task_hits(dialect, scoped_tasks_query(current_user), q))
+    if type != "tasks":
+        parts.append(task_log_hits(dialect, user_scope(current_user, TaskLog.user_id), q))
+    hits = (parts[0] if len(parts) == 1 else union_all(*parts)).subquery()
+    
+    page = (await db.execute(
+        select(hits.c.type, hits.c.id, hits.c.rank)
+        .order_by(hits.c.rank.desc(), hits.c.type, hits.c.id)
+        .offset(offset)
+        .limit(limit + 1)
+    )).all()
+    if len(page) > limit:
+        page = page[:limit]
+        response.headers["X-Next-Cursor"] = base64.urlsafe_b64encode(str(offset + limit).encode('ascii')).decode('ascii')
+    
+    # Load the page's rows in one query per type
+    task_ids = [hit.id for hit in page if hit.type == "task"]
+    log_ids = [hit.id for hit in page if hit.type == "log"]
+    tasks = {task.id: task for task in (await db.scalars(
+        select(Task).options(task_load_options()).where(Task.id.in_(task_ids))
+    )).all()} if task_ids else {}
+    logs = {log.id: log for log in (await db.scalars(
+        select(TaskLog).where(TaskLog.id.in_(log_ids))
+    )).all()} if log_ids else {}
     
     return [
-        WFHRequestResponse(
-            id=str(req.id),
-            reason=req.reason,
-            startDate=req.start_date.isoformat(),
-            endDate=req.end_date.isoformat(),
-            status=req.status,
-            userId=str(req.user_id),
-            userName=req.user.name,
-            createdAt=req.created_at.isoformat()
+        SearchResultResponse(
+            type=hit.type,
+            id=str(hit.id),
+            rank=hit.rank,
+            task=task_response(tasks[hit.id]) if hit.type == "task" else None,
+            log=task_log_response(logs[hit.id]) if hit.type == "log" else None
         )
-        for req in requests
+        for hit in page
     ]
 
+# Export Routes
+@app.get("/api/exports/{resource}")
+async def export_rows(
+    resource: Literal["tasks", "task-logs", "attendance", "wfh"],
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream every row the caller can see as CSV or NDJSON, one cursor batch at a time"""
+    await db.close()  # the stream reads on its own session
+    build_query = EXPORT_QUERIES[resource]
+    return StreamingResponse(
+        stream_export(lambda stream_db: build_query(stream_db, current_user), format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{format}"'}
+    )
+
+# Import Routes
+@app.post("/api/admin/import/{kind}", response_model=ImportReport)
+async def import_rows(
+    kind: Literal["users", "tasks", "task-logs"],
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Bulk import from a CSV or NDJSON request body. Valid rows are written in
+    batches; invalid ones are skipped and listed in the report. Task rows
+    without assignerEmail are assigned by the importing admin.
+    """
+    if current_user.role != "Super Admin":
+        raise HTTPException(status_code=403, detail="Only Super Admin can import data")
+    
+    body = (await request.body()).decode("utf-8-sig")
+    # Batched writes and bcrypt run on the sync engine, off the event loop
+    return await run_in_threadpool(run_import, kind, io.StringIO(body), format, current_user.id)
+
+@app.get("/api/admin/pool", response_model=PoolStatusResponse)
+async def get_pool_status(current_user: Principal = Depends(get_current_user)):
+    """Connection pool gauges of the worker that serves this request"""
+    if current_user.role != "Super Admin":
+        raise HTTPException(status_code=403, detail="Only Super Admin can view pool status")
+    
+    return pool_status()
+
 # Approval Routes (placeholder)
 @app.get("/api/approvals")
-async def get_approvals(current_user: User = Depends(get_current_user)):
+async def get_approvals(current_user: Principal = Depends(get_current_user)):
     # Placeholder for approval system
     return []
 
+# ✅ Serve frontend files (registered last so the SPA fallback never shadows /api routes)
+if frontend_path.exists():
+    @app.get("/{full_path:path}")
+    async def serve_frontend(full_path: str, request: Request):
+        """
+        Serve frontend assets from memory, and index.html for all other
+        non-API routes (SPA fallback) so frontend routing like /dashboard works.
+        """
+        asset = static_assets.get(full_path.removeprefix("static/")) or static_assets.get("index.html")
+        return static_assets.response(request, asset)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Department membership and department user-list caches
+
+HOD role scoping needs the ids of everyone in the HOD's department. They
+are cached per department, so scoped queries for small departments can
+filter on a literal id list instead of a users subquery, and permission
+checks need no query.
+The /api/departments/{id}/users response is cached alongside. Both are
+dropped when a transaction that adds, moves or removes a user, or changes
+a department, commits; other workers catch up after DEPARTMENT_CACHE_TTL.
+"""
+import os
+import uuid
+from typing import FrozenSet, Iterable, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache, evict_after_commit
+from .models import Department, User
+
+DEPARTMENT_CACHE_SIZE = int(os.getenv("DEPARTMENT_CACHE_SIZE", "1000"))
+DEPARTMENT_CACHE_TTL = float(os.getenv("DEPARTMENT_CACHE_TTL", "60"))
+
+# Keyed by department id: frozenset of member user ids
+department_members = TTLCache(maxsize=DEPARTMENT_CACHE_SIZE, ttl=DEPARTMENT_CACHE_TTL)
+# Keyed by department id: List[UserResponse] of /api/departments/{id}/users
+department_users = TTLCache(maxsize=DEPARTMENT_CACHE_SIZE, ttl=DEPARTMENT_CACHE_TTL)
+
+
+async def department_member_ids(db: AsyncSession, department_id: uuid.UUID) -> FrozenSet[uuid.UUID]:
+    """Ids of the users in a department, from the cache or one query"""
+    members = department_members.get(department_id)
+    if members is None:
+        members = frozenset((await db.scalars(
+            select(User.id).where(User.department_id == department_id)
+        )).all())
+        department_members.set(department_id, members)
+    return members
+
+
+def cached_department_member_ids(department_id: uuid.UUID) -> Optional[FrozenSet[uuid.UUID]]:
+    """Cached member ids, or None when they are not cached (callers fall back to a subquery)"""
+    return department_members.get(department_id)
+
+
+def evict_departments(department_ids: Iterable[Optional[uuid.UUID]]):
+    for department_id in department_ids:
+        if department_id is not None:
+            department_members.pop(department_id)
+            department_users.pop(department_id)
+
+
+# Invalidation: ORM changes that add, move or remove users, or change a department,
+# once their transaction commits
+def _evict_on_commit(target, department_ids):
+    for department_id in department_ids:
+        if department_id is not None:
+            evict_after_commit(target, department_members, department_id)
+            evict_after_commit(target, department_users, department_id)
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_delete")
+def _evict_user_department(mapper, connection, target):
+    _evict_on_commit(target, [target.department_id])
+
+@event.listens_for(User, "after_update")
+def _evict_user_departments(mapper, connection, target):
+    # Both the old and the new department when the user moved; the list shows names and roles too
+    history = inspect(target).attrs.department_id.history
+    _evict_on_commit(target, [target.department_id, *history.deleted])
+
+@event.listens_for(Department, "after_update")
+@event.listens_for(Department, "after_delete")
+def _evict_department(mapper, connection, target):
+    _evict_on_commit(target, [target.id])
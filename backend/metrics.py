@@ -0,0 +1,233 @@
+"""
+Request and database instrumentation for /metrics
+
+MetricsMiddleware times every HTTP request and labels it with the route
+template it matched (`/api/task-logs/{user_id}`, not the concrete path).
+Engine-wide cursor events count the queries and DB time of the request
+they run in, which is tracked through a context variable, so it also
+covers work handed to the threadpool. Everything is exposed in the
+Prometheus text format by render_metrics(). Values are per worker process.
+"""
+import threading
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .database import pool_status, replica_engine, replica_router
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Route label of requests that matched no route
+UNMATCHED_ROUTE = "<unmatched>"
+
+# (metric name, pool_status() key, type, help)
+POOL_METRICS = [
+    ("taskflow_db_pool_size", "size", "gauge", "Persistent connections of the request pool"),
+    ("taskflow_db_pool_checked_out", "checkedOut", "gauge", "Connections currently checked out"),
+    ("taskflow_db_pool_checked_in", "checkedIn", "gauge", "Idle connections in the pool"),
+    ("taskflow_db_pool_overflow", "overflow", "gauge", "Open connections beyond the pool size"),
+    ("taskflow_db_pool_waiting", "waiting", "gauge", "Callers waiting for a connection"),
+    ("taskflow_db_pool_checkouts_total", "checkouts", "counter", "Connection checkouts"),
+    ("taskflow_db_pool_checkout_wait_seconds_total", "checkoutWaitSeconds", "counter", "Time spent waiting for a connection"),
+    ("taskflow_db_pool_timeouts_total", "checkoutTimeouts", "counter", "Checkouts that gave up after DB_POOL_TIMEOUT"),
+    ("taskflow_db_pool_connects_total", "connects", "counter", "New database connections opened"),
+    ("taskflow_db_pool_connect_seconds_total", "connectSeconds", "counter", "Time spent opening database connections"),
+]
+
+
+@dataclass
+class RequestCost:
+    """Database work done on behalf of one request"""
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+request_cost: ContextVar[Optional[RequestCost]] = ContextVar("request_cost", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class RequestMetrics:
+    """Per (method, route) latency histograms, status counts and DB cost"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = defaultdict(Histogram)
+        self.statuses = defaultdict(int)
+        self.queries = defaultdict(int)
+        self.db_seconds = defaultdict(float)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, cost: RequestCost):
+        key = (method, route)
+        with self.lock:
+            self.latency[key].observe(seconds)
+            self.statuses[(method, route, status)] += 1
+            self.queries[key] += cost.queries
+            self.db_seconds[key] += cost.db_seconds
+
+
+request_metrics = RequestMetrics()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if request_cost.get() is not None:
+        conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    cost = request_cost.get()
+    if cost is not None and conn.info.get("query_started"):
+        cost.queries += 1
+        cost.db_seconds += perf_counter() - conn.info["query_started"].pop()
+
+
+@event.listens_for(Engine, "handle_error")
+def record_failed_query(exception_context):
+    cost = request_cost.get()
+    conn = exception_context.connection
+    if cost is not None and conn is not None and conn.info.get("query_started"):
+        cost.queries += 1
+        cost.db_seconds += perf_counter() - conn.info["query_started"].pop()
+
+
+def server_timing(seconds: float, cost: RequestCost) -> bytes:
+    return (
+        f'app;dur={seconds * 1000:.1f}, '
+        f'db;dur={cost.db_seconds * 1000:.1f};desc="{cost.queries} queries"'
+    ).encode("latin-1")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware, so streamed responses are timed to their last
+    byte. Server-Timing reports the work done before the headers went out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cost = RequestCost()
+        token = request_cost.set(cost)
+        started = perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(perf_counter() - started, cost)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_cost.reset(token)
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            request_metrics.observe(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+                perf_counter() - started,
+                cost
+            )
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**values) -> str:
+    return ",".join(f'{name}="{escape_label(str(value))}"' for name, value in values.items())
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    with request_metrics.lock:
+        latency = {key: (list(h.counts), h.sum, h.count) for key, h in request_metrics.latency.items()}
+        statuses = dict(request_metrics.statuses)
+        queries = dict(request_metrics.queries)
+        db_seconds = dict(request_metrics.db_seconds)
+
+    lines = [
+        "# HELP taskflow_http_request_duration_seconds Request latency by route template",
+        "# TYPE taskflow_http_request_duration_seconds histogram",
+    ]
+    for (method, route), (counts, total, count) in sorted(latency.items()):
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, counts):
+            cumulative += bucket_count
+            lines.append(
+                f"taskflow_http_request_duration_seconds_bucket{{{labels(method=method, route=route, le=bound)}}} {cumulative}"
+            )
+        lines.append(
+            f'taskflow_http_request_duration_seconds_bucket{{{labels(method=method, route=route, le="+Inf")}}} {count}'
+        )
+        lines.append(f"taskflow_http_request_duration_seconds_sum{{{labels(method=method, route=route)}}} {total}")
+        lines.append(f"taskflow_http_request_duration_seconds_count{{{labels(method=method, route=route)}}} {count}")
+
+    lines += [
+        "# HELP taskflow_http_requests_total Requests by route template and status code",
+        "# TYPE taskflow_http_requests_total counter",
+    ]
+    for (method, route, status), count in sorted(statuses.items()):
+        lines.append(f"taskflow_http_requests_total{{{labels(method=method, route=route, status=status)}}} {count}")
+
+    lines += [
+        "# HELP taskflow_db_queries_total SQL statements executed by requests, by route template",
+        "# TYPE taskflow_db_queries_total counter",
+    ]
+    for (method, route), count in sorted(queries.items()):
+        lines.append(f"taskflow_db_queries_total{{{labels(method=method, route=route)}}} {count}")
+
+    lines += [
+        "# HELP taskflow_db_query_seconds_total Time requests spent in SQL statements, by route template",
+        "# TYPE taskflow_db_query_seconds_total counter",
+    ]
+    for (method, route), seconds in sorted(db_seconds.items()):
+        lines.append(f"taskflow_db_query_seconds_total{{{labels(method=method, route=route)}}} {seconds}")
+
+    pool = pool_status()
+    for name, key, kind, description in POOL_METRICS:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}", f"{name} {pool[key]}"]
+
+    if replica_engine is not None:
+        lag = replica_router.lag
+        lines += [
+            "# HELP taskflow_db_replica_lag_seconds Last measured replica lag (NaN while unreachable)",
+            "# TYPE taskflow_db_replica_lag_seconds gauge",
+            f"taskflow_db_replica_lag_seconds {lag if lag is not None else 'NaN'}",
+            "# HELP taskflow_db_routed_reads_total Read-only requests by the database that served them",
+            "# TYPE taskflow_db_routed_reads_total counter",
+            f'taskflow_db_routed_reads_total{{target="replica"}} {replica_router.replica_reads}',
+            f'taskflow_db_routed_reads_total{{target="primary"}} {replica_router.primary_reads}',
+        ]
+
+    return "\n".join(lines) + "\n"
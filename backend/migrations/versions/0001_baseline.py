@@ -0,0 +1,130 @@
+"""Baseline schema previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Databases that were set up by the old create_all startup have no
+alembic_version table, so every table here is only created when missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+user_role = sa.Enum('EMPLOYEE', 'HOD', 'SUPER_ADMIN', name='userrole')
+task_status = sa.Enum('TODO', 'IN_PROGRESS', 'DONE', name='taskstatus')
+task_priority = sa.Enum('LOW', 'MEDIUM', 'HIGH', name='taskpriority')
+wfh_status = sa.Enum('PENDING', 'APPROVED', 'REJECTED', name='wfhstatus')
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'departments' not in existing:
+        op.create_table(
+            'departments',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('description', sa.Text()),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime()),
+        )
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('email', sa.String(255), nullable=False, unique=True),
+            sa.Column('password', sa.String(255), nullable=False),
+            sa.Column('role', user_role, nullable=False),
+            sa.Column('department_id', UUID(as_uuid=True), sa.ForeignKey('departments.id')),
+            sa.Column('avatar_url', sa.String(500)),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime()),
+        )
+
+    if 'tasks' not in existing:
+        op.create_table(
+            'tasks',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True),
+            sa.Column('title', sa.String(200), nullable=False),
+            sa.Column('description', sa.Text()),
+            sa.Column('status', task_status, nullable=False),
+            sa.Column('priority', task_priority, nullable=False),
+            sa.Column('due_date', sa.DateTime()),
+            sa.Column('assigner_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime()),
+        )
+
+    if 'task_assignees' not in existing:
+        op.create_table(
+            'task_assignees',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True),
+            sa.Column('task_id', UUID(as_uuid=True), sa.ForeignKey('tasks.id'), nullable=False),
+            sa.Column('assignee_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('assigned_at', sa.DateTime()),
+        )
+
+    if 'task_tombstones' not in existing:
+        op.create_table(
+            'task_tombstones',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True),
+            sa.Column('task_id', UUID(as_uuid=True), nullable=False),
+            sa.Column('assignee_id', UUID(as_uuid=True)),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+        )
+
+    if 'task_logs' not in existing:
+        op.create_table(
+            'task_logs',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True),
+            sa.Column('description', sa.Text(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('start_time', sa.DateTime()),
+            sa.Column('end_time', sa.DateTime()),
+            sa.Column('duration_minutes', sa.Integer()),
+            sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('created_at', sa.DateTime()),
+        )
+
+    if 'attendance' not in existing:
+        op.create_table(
+            'attendance',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True),
+            sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('check_in', sa.DateTime()),
+            sa.Column('check_out', sa.DateTime()),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime()),
+        )
+
+    if 'wfh_requests' not in existing:
+        op.create_table(
+            'wfh_requests',
+            sa.Column('id', UUID(as_uuid=True), primary_key=True),
+            sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('reason', sa.Text(), nullable=False),
+            sa.Column('start_date', sa.Date(), nullable=False),
+            sa.Column('end_date', sa.Date(), nullable=False),
+            sa.Column('status', wfh_status, nullable=False),
+            sa.Column('approved_by', UUID(as_uuid=True), sa.ForeignKey('users.id')),
+            sa.Column('approved_at', sa.DateTime()),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('updated_at', sa.DateTime()),
+        )
+
+
+def downgrade():
+    for table in ('wfh_requests', 'attendance', 'task_logs', 'task_tombstones',
+                  'task_assignees', 'tasks', 'users', 'departments'):
+        op.drop_table(table)
+    for enum in (wfh_status, task_priority, task_status, user_role):
+        enum.drop(op.get_bind(), checkfirst=True)
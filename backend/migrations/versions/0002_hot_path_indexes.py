@@ -0,0 +1,54 @@
+"""Indexes for the hot lookup columns and one attendance row per user per day
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_users_department_id', 'users', ['department_id']),
+    ('ix_tasks_assigner_id', 'tasks', ['assigner_id']),
+    ('ix_tasks_updated_at', 'tasks', ['updated_at']),
+    ('ix_tasks_created_at_id', 'tasks', ['created_at', 'id']),
+    ('ix_task_assignees_task_id', 'task_assignees', ['task_id']),
+    ('ix_task_assignees_assignee_id', 'task_assignees', ['assignee_id']),
+    ('ix_task_tombstones_created_at', 'task_tombstones', ['created_at']),
+    ('ix_task_logs_user_id_date', 'task_logs', ['user_id', 'date']),
+    ('ix_wfh_requests_user_id_status', 'wfh_requests', ['user_id', 'status']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+    # Keep the earliest row of any duplicated (user_id, date) before enforcing uniqueness
+    op.execute(
+        """
+        DELETE FROM attendance WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id, date ORDER BY created_at, id
+                ) AS rn
+                FROM attendance
+            ) ranked
+            WHERE rn > 1
+        )
+        """
+    )
+    with op.batch_alter_table('attendance') as batch:
+        batch.create_unique_constraint('uq_attendance_user_id_date', ['user_id', 'date'])
+
+
+def downgrade():
+    with op.batch_alter_table('attendance') as batch:
+        batch.drop_constraint('uq_attendance_user_id_date', type_='unique')
+
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
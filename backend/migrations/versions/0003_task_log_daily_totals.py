@@ -0,0 +1,40 @@
+"""Per user per day rollup of logged task minutes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'task_log_daily_totals',
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('date', sa.Date(), primary_key=True),
+        sa.Column('minutes', sa.Integer(), nullable=False),
+        sa.Column('log_count', sa.Integer(), nullable=False),
+    )
+    op.create_index('ix_task_log_daily_totals_date', 'task_log_daily_totals', ['date'])
+
+    # Backfill from the existing logs
+    op.execute(
+        """
+        INSERT INTO task_log_daily_totals (user_id, date, minutes, log_count)
+        SELECT user_id, date, coalesce(sum(duration_minutes), 0), count(*)
+        FROM task_logs
+        GROUP BY user_id, date
+        """
+    )
+
+
+def downgrade():
+    op.drop_index('ix_task_log_daily_totals_date', table_name='task_log_daily_totals')
+    op.drop_table('task_log_daily_totals')
@@ -0,0 +1,73 @@
+"""Full-text search indexes over task titles/descriptions and task log descriptions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+Postgres: GIN expression indexes on the same to_tsvector() expressions
+that backend/search.py queries with.
+
+SQLite: external-content FTS5 tables keyed by the base table rowid, kept
+in sync by triggers; the update trigger fires only when an indexed column
+changes, so status moves and assignments do not rewrite the index. A VACUUM may renumber rowids of these tables; run
+INSERT INTO tasks_fts(tasks_fts) VALUES('rebuild') (and the same for
+task_logs_fts) afterwards.
+"""
+from alembic import op
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+FTS_TABLES = [
+    # (fts table, base table, indexed columns)
+    ('tasks_fts', 'tasks', ['title', 'description']),
+    ('task_logs_fts', 'task_logs', ['description']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_tasks_search ON tasks USING gin "
+            "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '')))"
+        )
+        op.execute(
+            "CREATE INDEX ix_task_logs_search ON task_logs USING gin "
+            "(to_tsvector('english', description))"
+        )
+        return
+
+    for fts, table, columns in FTS_TABLES:
+        names = ', '.join(columns)
+        new = ', '.join(f'new.{column}' for column in columns)
+        old = ', '.join(f'old.{column}' for column in columns)
+        op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table}')")
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {new}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.rowid, {old}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.rowid, {old}); "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {new}); END"
+        )
+        # Index the rows that already exist
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX ix_task_logs_search")
+        op.execute("DROP INDEX ix_tasks_search")
+        return
+
+    for fts, _, _ in reversed(FTS_TABLES):
+        for suffix in ('au', 'ad', 'ai'):
+            op.execute(f"DROP TRIGGER {fts}_{suffix}")
+        op.execute(f"DROP TABLE {fts}")
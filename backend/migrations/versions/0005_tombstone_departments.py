@@ -0,0 +1,24 @@
+"""Department of the assignee on task tombstones written when a user changes department
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task_tombstones') as batch:
+        batch.add_column(sa.Column('department_id', UUID(as_uuid=True), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('task_tombstones') as batch:
+        batch.drop_column('department_id')
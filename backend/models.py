@@ -1,29 +1,33 @@
-from sqlalchemy import Column, String, DateTime, Text, Enum, ForeignKey, Integer, Date, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Enum, ForeignKey, Integer, Date, Boolean, Index, UniqueConstraint, delete, event, inspect, insert, select, update
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+import os
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import enum
 
+# Tombstones older than this are pruned; /api/tasks/changes rejects cursors older than it
+TASK_TOMBSTONE_RETENTION_DAYS = int(os.getenv("TASK_TOMBSTONE_RETENTION_DAYS", "30"))
+
 Base = declarative_base()
 
-class UserRole(enum.Enum):
+class UserRole(str, enum.Enum):
     EMPLOYEE = "Employee"
     HOD = "HOD"
     SUPER_ADMIN = "Super Admin"
 
-class TaskStatus(enum.Enum):
+class TaskStatus(str, enum.Enum):
     TODO = "To Do"
     IN_PROGRESS = "In Progress"
     DONE = "Done"
 
-class TaskPriority(enum.Enum):
+class TaskPriority(str, enum.Enum):
     LOW = "Low"
     MEDIUM = "Medium"
     HIGH = "High"
 
-class WFHStatus(enum.Enum):
+class WFHStatus(str, enum.Enum):
     PENDING = "Pending"
     APPROVED = "Approved"
     REJECTED = "Rejected"
@@ -48,7 +52,7 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False)
     password = Column(String(255), nullable=False)
     role = Column(Enum(UserRole, native_enum=True), nullable=False, default=UserRole.EMPLOYEE)
-    department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"))
+    department_id = Column(UUID(as_uuid=True), ForeignKey("departments.id"), index=True)
     avatar_url = Column(String(500))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -74,9 +78,14 @@ class Task(Base):
     status = Column(Enum(TaskStatus, native_enum=True), nullable=False, default=TaskStatus.TODO)
     priority = Column(Enum(TaskPriority, native_enum=True), nullable=False, default=TaskPriority.MEDIUM)
     due_date = Column(DateTime)
-    assigner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    assigner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    
+    __table_args__ = (
+        # Keyset pagination order of GET /api/tasks
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+    )
     
     # Relationships
     assigner = relationship("User", back_populates="created_tasks")
@@ -86,14 +95,25 @@ class TaskAssignee(Base):
     __tablename__ = "task_assignees"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
-    assignee_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False, index=True)
+    assignee_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     assigned_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     task = relationship("Task", back_populates="assignees")
     assignee = relationship("User", back_populates="assigned_tasks")
 
+class TaskTombstone(Base):
+    """Marks a task deleted, removed from one assignee, or moved out of a department, for delta sync"""
+    __tablename__ = "task_tombstones"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    task_id = Column(UUID(as_uuid=True), nullable=False)
+    assignee_id = Column(UUID(as_uuid=True))  # NULL when the whole task was deleted
+    # Department the assignee left, when they moved to another department
+    department_id = Column(UUID(as_uuid=True))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
 class TaskLog(Base):
     __tablename__ = "task_logs"
     
@@ -106,9 +126,26 @@ class TaskLog(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_task_logs_user_id_date", "user_id", "date"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="task_logs")
 
+class TaskLogDailyTotal(Base):
+    """Logged minutes per user per day, kept in step with task_logs by create_task_log"""
+    __tablename__ = "task_log_daily_totals"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    minutes = Column(Integer, nullable=False, default=0)
+    log_count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_task_log_daily_totals_date", "date"),
+    )
+
 class Attendance(Base):
     __tablename__ = "attendance"
     
@@ -120,6 +157,11 @@ class Attendance(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # One attendance row per user per day; also serves the (user_id, date) lookups
+        UniqueConstraint("user_id", "date", name="uq_attendance_user_id_date"),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="attendance_records")
 
@@ -137,6 +179,10 @@ class WFHRequest(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        Index("ix_wfh_requests_user_id_status", "user_id", "status"),
+    )
+    
     # Relationships
     user = relationship(
         "User",
@@ -144,3 +190,49 @@ class WFHRequest(Base):
         foreign_keys=[user_id]
     )
     approver = relationship("User", foreign_keys=[approved_by])
+
+
+# Delta sync: record what disappeared so /api/tasks/changes can emit tombstones
+def tombstone_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(days=TASK_TOMBSTONE_RETENTION_DAYS)
+
+def write_tombstones(connection, rows):
+    """Insert tombstone rows and prune the ones past the retention period"""
+    now = datetime.utcnow()
+    connection.execute(insert(TaskTombstone.__table__), [
+        {"id": uuid.uuid4(), "assignee_id": None, "department_id": None, "created_at": now, **row}
+        for row in rows
+    ])
+    connection.execute(delete(TaskTombstone.__table__).where(TaskTombstone.created_at < tombstone_cutoff()))
+
+@event.listens_for(Task, "after_delete")
+def _tombstone_task(mapper, connection, target):
+    write_tombstones(connection, [{"task_id": target.id}])
+
+@event.listens_for(TaskAssignee, "after_delete")
+def _tombstone_assignment(mapper, connection, target):
+    write_tombstones(connection, [{"task_id": target.task_id, "assignee_id": target.assignee_id}])
+
+@event.listens_for(User, "after_update")
+def _record_department_move(mapper, connection, target):
+    history = inspect(target).attrs.department_id.history
+    if not history.has_changes():
+        return
+    # The user's tasks enter the new department's HOD scope: bumping assigned_at
+    # makes delta sync report them as changed
+    connection.execute(
+        update(TaskAssignee.__table__).where(TaskAssignee.assignee_id == target.id)
+        .values(assigned_at=datetime.utcnow())
+    )
+    # ...and leave the old department's HOD scope (unless the HOD created them)
+    old_department_ids = [i for i in history.deleted if i is not None]
+    if not old_department_ids:
+        return
+    task_ids = connection.execute(
+        select(TaskAssignee.task_id).where(TaskAssignee.assignee_id == target.id)
+    ).scalars().all()
+    if task_ids:
+        write_tombstones(connection, [
+            {"task_id": task_id, "assignee_id": target.id, "department_id": department_id}
+            for task_id in task_ids for department_id in old_department_ids
+        ])
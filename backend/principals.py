@@ -0,0 +1,54 @@
+"""
+Authenticated principal cache used by get_current_user
+"""
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+from .cache import TTLCache, evict_after_commit
+from .models import Department, User, UserRole
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Identity of the caller, detached from any DB session"""
+    id: uuid.UUID
+    name: str
+    email: str
+    role: UserRole
+    department_id: Optional[uuid.UUID]
+    department_name: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            role=user.role,
+            department_id=user.department_id,
+            department_name=user.department.name if user.department else None
+        )
+
+
+# Keyed by user id
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+# Invalidation: ORM changes to a user or department, once their transaction commits
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_user(mapper, connection, target):
+    evict_after_commit(target, principal_cache, target.id)
+
+@event.listens_for(Department, "after_update")
+@event.listens_for(Department, "after_delete")
+def _evict_department(mapper, connection, target):
+    department_id = target.id
+    evict_after_commit(target, principal_cache, where=lambda principal: principal.department_id == department_id)
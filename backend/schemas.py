@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, field_validator
+from typing import Dict, List, Optional
 from datetime import datetime, date
+from uuid import UUID
 from .models import UserRole, TaskStatus, TaskPriority, WFHStatus
 
 # User Schemas
@@ -11,7 +12,7 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     password: str
-    department_id: Optional[str] = None
+    department_id: Optional[UUID] = None
 
 class UserResponse(UserBase):
     id: str
@@ -39,7 +40,7 @@ class TaskBase(BaseModel):
     dueDate: Optional[datetime] = None
 
 class TaskCreate(TaskBase):
-    assigneeIds: List[str]
+    assigneeIds: List[UUID]
 
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
@@ -48,6 +49,13 @@ class TaskUpdate(BaseModel):
     priority: Optional[TaskPriority] = None
     dueDate: Optional[datetime] = None
 
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate]
+
+class TaskBulkStatusUpdate(BaseModel):
+    taskIds: List[UUID]
+    status: TaskStatus
+
 class TaskAssigneeResponse(BaseModel):
     assigneeId: str
     assigneeName: str
@@ -63,6 +71,11 @@ class TaskResponse(TaskBase):
     class Config:
         from_attributes = True
 
+class TaskChangesResponse(BaseModel):
+    tasks: List[TaskResponse]
+    removedTaskIds: List[str]
+    cursor: str
+
 # Task Log Schemas
 class TaskLogBase(BaseModel):
     description: str
@@ -84,6 +97,15 @@ class TaskLogResponse(TaskLogBase):
     class Config:
         from_attributes = True
 
+class TaskLogTotalResponse(BaseModel):
+    periodStart: date
+    userId: Optional[str] = None
+    userName: Optional[str] = None
+    departmentId: Optional[str] = None
+    department: Optional[str] = None
+    minutes: int
+    logCount: int
+
 # Attendance Schemas
 class AttendanceResponse(BaseModel):
     id: str
@@ -99,6 +121,30 @@ class AttendanceStatusResponse(BaseModel):
     checkIn: Optional[str] = None
     checkOut: Optional[str] = None
 
+class AttendanceReportEntry(BaseModel):
+    userId: str
+    userName: str
+    department: Optional[str] = None
+    daysPresent: int
+    workedHours: float
+    lateArrivals: int
+    missingCheckouts: int
+
+class AttendanceReportResponse(BaseModel):
+    fromDate: date
+    toDate: date
+    lateAfter: str
+    users: List[AttendanceReportEntry]
+
+# Dashboard Schemas
+class DashboardSummaryResponse(BaseModel):
+    totalTasks: int
+    tasksByStatus: Dict[str, int]
+    tasksByPriority: Dict[str, int]
+    overdueTasks: int
+    attendance: AttendanceStatusResponse
+    recentTasks: List[TaskResponse]
+
 # WFH Request Schemas
 class WFHRequestBase(BaseModel):
     reason: str
@@ -125,4 +171,68 @@ class DepartmentResponse(BaseModel):
     description: Optional[str] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Search Schemas
+class SearchResultResponse(BaseModel):
+    type: str  # "task" or "log"
+    id: str
+    rank: float
+    task: Optional[TaskResponse] = None
+    log: Optional[TaskLogResponse] = None
+
+# Import Schemas
+class UserImport(BaseModel):
+    name: str
+    email: EmailStr
+    password: str
+    role: UserRole = UserRole.EMPLOYEE
+    department: Optional[str] = None  # department name or id
+
+class TaskImport(BaseModel):
+    title: str
+    description: Optional[str] = None
+    status: TaskStatus = TaskStatus.TODO
+    priority: TaskPriority = TaskPriority.MEDIUM
+    dueDate: Optional[datetime] = None
+    assignerEmail: Optional[EmailStr] = None
+    assigneeEmails: List[EmailStr] = []
+
+    @field_validator("assigneeEmails", mode="before")
+    @classmethod
+    def split_emails(cls, value):
+        # CSV cells carry the list as "a@x.com; b@x.com"
+        if isinstance(value, str):
+            return [email.strip() for email in value.split(";") if email.strip()]
+        return value
+
+class TaskLogImport(BaseModel):
+    userEmail: EmailStr
+    description: str
+    date: date
+    startTime: Optional[datetime] = None
+    endTime: Optional[datetime] = None
+    durationMinutes: Optional[int] = None
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ImportReport(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+class PoolStatusResponse(BaseModel):
+    size: int
+    maxOverflow: int
+    checkedOut: int
+    checkedIn: int
+    overflow: int
+    waiting: int
+    checkouts: int
+    checkoutWaitSeconds: float
+    checkoutTimeouts: int
+    connects: int
+    connectSeconds: float
+    lastConnectSeconds: float
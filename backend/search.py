@@ -0,0 +1,67 @@
+"""
+Ranked full-text matches for /api/search
+
+Postgres matches the GIN-indexed to_tsvector() expressions created by
+migration 0004; the expressions below must stay textually identical to
+the indexed ones or the planner falls back to a sequential scan. SQLite
+matches the FTS5 tables from the same migration.
+"""
+import re
+
+from sqlalchemy import func, literal, literal_column, select, table, column
+
+from .models import Task, TaskLog
+
+TASK_DOCUMENT = literal_column(
+    "to_tsvector('english', coalesce(tasks.title, '') || ' ' || coalesce(tasks.description, ''))"
+)
+TASK_LOG_DOCUMENT = literal_column("to_tsvector('english', task_logs.description)")
+
+tasks_fts = table("tasks_fts", column("rowid"))
+task_logs_fts = table("task_logs_fts", column("rowid"))
+
+
+def fts5_query(text: str) -> str:
+    """Quote every word so user input can never be parsed as FTS5 syntax; words are ANDed"""
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", text))
+
+
+def task_hits(dialect: str, scope_query, text: str):
+    """(type, id, rank) of tasks in scope_query matching text; higher rank is better"""
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(literal_column("'english'"), text)
+        return scope_query.where(TASK_DOCUMENT.op("@@")(tsquery)).with_only_columns(
+            literal("task").label("type"),
+            Task.id.label("id"),
+            func.ts_rank(TASK_DOCUMENT, tsquery).label("rank")
+        )
+    return scope_query.join(
+        tasks_fts, tasks_fts.c.rowid == literal_column("tasks.rowid")
+    ).where(
+        literal_column("tasks_fts").op("MATCH")(fts5_query(text))
+    ).with_only_columns(
+        literal("task").label("type"),
+        Task.id.label("id"),
+        # bm25() is lower for better matches
+        (-func.bm25(literal_column("tasks_fts"))).label("rank")
+    )
+
+
+def task_log_hits(dialect: str, scope, text: str):
+    """(type, id, rank) of task logs matching text, filtered by the scope condition"""
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(literal_column("'english'"), text)
+        return select(
+            literal("log").label("type"),
+            TaskLog.id.label("id"),
+            func.ts_rank(TASK_LOG_DOCUMENT, tsquery).label("rank")
+        ).where(TASK_LOG_DOCUMENT.op("@@")(tsquery), scope)
+    return select(
+        literal("log").label("type"),
+        TaskLog.id.label("id"),
+        (-func.bm25(literal_column("task_logs_fts"))).label("rank")
+    ).join(
+        task_logs_fts, task_logs_fts.c.rowid == literal_column("task_logs.rowid")
+    ).where(
+        literal_column("task_logs_fts").op("MATCH")(fts5_query(text)), scope
+    )
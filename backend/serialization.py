@@ -0,0 +1,85 @@
+"""
+orjson fast path for the list endpoints
+
+Rows are projected straight from ORM objects into plain dicts and
+serialized once by orjson, instead of building pydantic models that
+FastAPI then validates and serializes a second time. orjson writes
+UUIDs, enums (by value) and datetimes (ISO 8601) itself, producing the
+same JSON as the pydantic response models.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from fastapi.responses import ORJSONResponse
+
+TASK_FIELDS = {
+    "id": lambda task: task.id,
+    "title": lambda task: task.title,
+    "description": lambda task: task.description,
+    "priority": lambda task: task.priority,
+    "dueDate": lambda task: task.due_date,
+    "status": lambda task: task.status,
+    "assignerId": lambda task: task.assigner_id,
+    "assignees": lambda task: [
+        {"assigneeId": ta.assignee_id, "assigneeName": ta.assignee.name}
+        for ta in task.assignees
+    ],
+    "createdAt": lambda task: task.created_at,
+    "updatedAt": lambda task: task.updated_at,
+}
+
+TASK_LOG_FIELDS = {
+    "id": lambda log: log.id,
+    "description": lambda log: log.description,
+    "date": lambda log: log.date,
+    "startTime": lambda log: log.start_time,
+    "endTime": lambda log: log.end_time,
+    "durationMinutes": lambda log: log.duration_minutes,
+    "userId": lambda log: log.user_id,
+    "createdAt": lambda log: log.created_at,
+}
+
+WFH_FIELDS = {
+    "id": lambda req: req.id,
+    "reason": lambda req: req.reason,
+    "startDate": lambda req: req.start_date,
+    "endDate": lambda req: req.end_date,
+    "status": lambda req: req.status,
+    "userId": lambda req: req.user_id,
+    "userName": lambda req: req.user.name,
+    "createdAt": lambda req: req.created_at,
+}
+
+
+def select_fields(fields: Optional[str], available: dict) -> dict:
+    """
+    Getters for a `fields=a,b,c` sparse fieldset; all fields when it is empty.
+    `id` is always included so clients can merge partial rows.
+    """
+    if not fields:
+        return available
+
+    names = ["id"] + [name.strip() for name in fields.split(",") if name.strip() and name.strip() != "id"]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}"
+        )
+    return {name: available[name] for name in dict.fromkeys(names)}
+
+
+def project(rows, getters: dict) -> list:
+    getters = list(getters.items())
+    return [{name: get(row) for name, get in getters} for row in rows]
+
+
+def fast_json(content, response: Response) -> ORJSONResponse:
+    """
+    Serialize content with orjson, bypassing response_model validation.
+    Headers already set on the injected `response` (ETag, X-Next-Cursor)
+    are carried over, since FastAPI only merges them for non-Response returns.
+    """
+    fast = ORJSONResponse(content)
+    fast.headers.raw.extend(response.headers.raw)
+    return fast
@@ -0,0 +1,109 @@
+"""
+In-memory, precompressed frontend assets
+
+Every file under frontend/ is read once at startup together with its gzip
+and (when the brotli package is installed) brotli variants. index.html is
+rewritten to load app.js / styles.css through fingerprinted URLs
+(`/app.js?v=<hash>`), which are cached by browsers for a year; index.html
+itself is revalidated with its ETag on every load.
+"""
+import gzip
+import hashlib
+import mimetypes
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Below this size compression is not worth a round of CPU on the client
+COMPRESS_MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+ASSET_REFERENCE = re.compile(r'(src|href)="([^"?#:]+)"')
+
+
+@dataclass
+class Asset:
+    body: bytes
+    media_type: str
+    etag: str
+    encodings: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, name: str, body: bytes) -> "Asset":
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        asset = cls(body=body, media_type=media_type, etag=hashlib.sha256(body).hexdigest()[:16])
+        if len(body) >= COMPRESS_MIN_SIZE and media_type.startswith(COMPRESSIBLE_TYPES):
+            asset.encodings["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                asset.encodings["br"] = brotli.compress(body, quality=11)
+        return asset
+
+    def negotiate(self, accept_encoding: str):
+        """(encoding, body) for the best variant the client accepts"""
+        accepted = {
+            token.split(";")[0].strip()
+            for token in accept_encoding.lower().split(",")
+            if not token.strip().endswith(";q=0")
+        }
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.encodings:
+                return encoding, self.encodings[encoding]
+        return None, self.body
+
+
+class StaticAssets:
+    def __init__(self, root: Path):
+        self.root = root
+        self.assets: Dict[str, Asset] = {}
+
+    def load(self):
+        """Read, fingerprint and compress everything under root"""
+        assets = {
+            path.relative_to(self.root).as_posix(): Asset.build(path.name, path.read_bytes())
+            for path in sorted(self.root.rglob("*"))
+            if path.is_file()
+        }
+
+        # Point HTML at fingerprinted URLs of the other assets
+        def fingerprint(match):
+            attribute, name = match.groups()
+            asset = assets.get(name.lstrip("/"))
+            if asset is None or name.endswith(".html"):
+                return match.group(0)
+            return f'{attribute}="/{name.lstrip("/")}?v={asset.etag}"'
+
+        for name, asset in list(assets.items()):
+            if asset.media_type == "text/html":
+                html = ASSET_REFERENCE.sub(fingerprint, asset.body.decode("utf-8"))
+                assets[name] = Asset.build(name, html.encode("utf-8"))
+
+        self.assets = assets
+
+    def get(self, path: str) -> Optional[Asset]:
+        return self.assets.get(path.lstrip("/"))
+
+    def response(self, request: Request, asset: Asset) -> Response:
+        encoding, body = asset.negotiate(request.headers.get("accept-encoding", ""))
+        etag = f'"{asset.etag}-{encoding}"' if encoding else f'"{asset.etag}"'
+        fingerprinted = request.query_params.get("v") == asset.etag
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE if fingerprinted else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=asset.media_type, headers=headers)
@@ -3,6 +3,7 @@ class AppState {
   constructor() {
     this.user = null;
     this.tasks = [];
+    this.tasksCursor = null; // delta-sync cursor while state.tasks holds the kanban list
     this.taskLogs = [];
     this.attendanceStatus = null;
     this.currentView = "dashboard";
@@ -32,6 +33,36 @@ function removeAuthToken() {
   localStorage.removeItem("auth_token");
 }
 
+// Last ETag and body per GET URL, revalidated with If-None-Match
+const responseCache = new Map();
+
+// GET with conditional revalidation; returns the fetch Response and parsed body
+async function cachedGet(url, headers) {
+  const cached = responseCache.get(url);
+  if (cached) {
+    headers = { ...headers, "If-None-Match": cached.etag };
+  }
+
+  const response = await fetch(url, { method: "GET", headers });
+
+  if (response.status === 304 && cached) {
+    return { response, body: cached.body };
+  }
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || "API request failed");
+  }
+
+  const body = await response.json();
+  const etag = response.headers.get("ETag");
+  if (etag) {
+    responseCache.set(url, { etag, body });
+  }
+
+  return { response, body };
+}
+
 // ✅ central API wrapper
 async function apiRequest(method, endpoint, data = null) {
   const headers = { "Content-Type": "application/json" };
@@ -42,6 +73,11 @@ async function apiRequest(method, endpoint, data = null) {
     headers["Authorization"] = `Bearer ${token}`;
   }
 
+  if (method === "GET") {
+    const { body } = await cachedGet(`/api${endpoint}`, headers);
+    return body;
+  }
+
   const response = await fetch(`/api${endpoint}`, {
     method,
     headers,
@@ -56,6 +92,92 @@ async function apiRequest(method, endpoint, data = null) {
   return response.json();
 }
 
+// Fetch every page of a cursor-paginated list endpoint
+async function apiRequestAllPages(endpoint, params = {}) {
+  const headers = {};
+  const token = localStorage.getItem("token");
+  if (token) {
+    headers["Authorization"] = `Bearer ${token}`;
+  }
+
+  const query = new URLSearchParams(params);
+  let items = [];
+
+  while (true) {
+    const { response, body } = await cachedGet(
+      `/api${endpoint}?${query}`,
+      headers
+    );
+
+    items = items.concat(body);
+
+    const nextCursor = response.headers.get("X-Next-Cursor");
+    if (!nextCursor) break;
+    query.set("cursor", nextCursor);
+  }
+
+  return items;
+}
+
+// Server-side filters for the kanban task filter dropdown
+function kanbanTaskParams() {
+  const filter = document.getElementById("task-filter").value;
+
+  switch (filter) {
+    case "my-tasks":
+      return { assignee_id: state.user.id };
+    case "assigned-by-me":
+      return { assigner_id: state.user.id };
+    default:
+      return {};
+  }
+}
+
+// Live updates over Server-Sent Events
+let eventSource = null;
+const TASK_EVENT_RELOAD_DELAY_MS = 500;
+
+function connectEventStream() {
+  const token = localStorage.getItem("token");
+  if (!token || eventSource) return;
+
+  eventSource = new EventSource(
+    `/api/events?token=${encodeURIComponent(token)}`
+  );
+
+  // Coalesce bursts of task events into one reload
+  let reloadTimer = null;
+  const onTaskEvent = () => {
+    if (reloadTimer) return;
+    reloadTimer = setTimeout(() => {
+      reloadTimer = null;
+      if (state.currentView === "kanban" || state.currentView === "dashboard") {
+        loadViewData(state.currentView);
+      }
+    }, TASK_EVENT_RELOAD_DELAY_MS);
+  };
+  eventSource.addEventListener("task.created", onTaskEvent);
+  eventSource.addEventListener("task.updated", onTaskEvent);
+  eventSource.addEventListener("tasks.bulk", onTaskEvent);
+
+  const onAttendanceEvent = async (e) => {
+    const data = JSON.parse(e.data);
+    if (data.userId === state.user?.id) {
+      state.attendanceStatus = await apiRequest("GET", "/attendance/status");
+      updateAttendanceStatus();
+    }
+  };
+  eventSource.addEventListener("attendance.checked_in", onAttendanceEvent);
+  eventSource.addEventListener("attendance.checked_out", onAttendanceEvent);
+}
+
+function disconnectEventStream() {
+  if (eventSource) {
+    eventSource.close();
+    eventSource = null;
+  }
+}
+
 // Toast Notifications
 function showToast(title, description, type = "success") {
   const container = document.getElementById("toast-container");
@@ -128,6 +250,7 @@ async function login(email, password) {
     state.user = response.user;
 
     await loadUserProfile();
+    connectEventStream();
     showPage("dashboard-page");
     setupUserInterface();
     loadDashboardData();
@@ -150,9 +273,12 @@ async function loadUserProfile() {
 }
 
 function logout() {
+  disconnectEventStream();
   removeAuthToken();
+  responseCache.clear();
   state.user = null;
   state.tasks = [];
+  state.tasksCursor = null;
   state.taskLogs = [];
   showPage("login-page");
   showToast("Goodbye!", "Successfully logged out.");
@@ -235,32 +361,60 @@ async function loadViewData(viewId) {
 
 async function loadDashboardData() {
   try {
-    const [tasks, attendance] = await Promise.all([
-      apiRequest("GET", "/tasks"),
-      apiRequest("GET", "/attendance/status"),
-    ]);
+    const summary = await apiRequest("GET", "/dashboard/summary");
 
-    state.tasks = tasks;
-    state.attendanceStatus = attendance;
+    state.attendanceStatus = summary.attendance;
 
-    updateDashboardStats();
+    updateDashboardStats(summary);
     updateAttendanceStatus();
-    renderRecentTasks();
+    renderRecentTasks(summary.recentTasks);
   } catch (error) {
     console.error("Failed to load dashboard data:", error);
   }
 }
 
+// Apply task changes since the last sync to state.tasks
+async function syncTaskChanges() {
+  const changes = await apiRequest(
+    "GET",
+    `/tasks/changes?since=${encodeURIComponent(state.tasksCursor)}`
+  );
+
+  const removed = new Set(changes.removedTaskIds);
+  const changed = new Map(changes.tasks.map((task) => [task.id, task]));
+
+  state.tasks = state.tasks
+    .filter((task) => !removed.has(task.id) && !changed.has(task.id))
+    .concat(changes.tasks);
+  state.tasksCursor = changes.cursor;
+}
+
 async function loadKanbanData() {
+  // Already holding the kanban list: only fetch what changed
+  if (state.tasksCursor) {
+    try {
+      await syncTaskChanges();
+      renderKanbanBoard();
+      return;
+    } catch (error) {
+      // Expired cursor or failed sync: fall back to a full reload
+      console.error("Failed to sync kanban data:", error);
+      state.tasksCursor = null;
+    }
+  }
+
   try {
+    // Take the cursor before the full load so nothing committed in between is missed
+    const { cursor } = await apiRequest("GET", "/tasks/changes");
     const [tasks, departmentUsers] = await Promise.all([
-      apiRequest("GET", "/tasks"),
+      apiRequestAllPages("/tasks", kanbanTaskParams()),
       state.user.role !== "Employee"
         ? apiRequest("GET", `/departments/${state.user.departmentId}/users`)
         : Promise.resolve([]),
     ]);
 
     state.tasks = tasks;
+    state.tasksCursor = cursor;
     state.departmentUsers = departmentUsers;
 
     renderKanbanBoard();
@@ -271,9 +425,10 @@ async function loadKanbanData() {
 }
 
 async function loadCalendarData() {
+  state.tasksCursor = null;
   try {
     const [tasks, taskLogs, departmentUsers] = await Promise.all([
-      apiRequest("GET", "/tasks"),
+      apiRequestAllPages("/tasks", { assignee_id: state.selectedUserId }),
       apiRequest("GET", `/task-logs/${state.selectedUserId}`),
       state.user.role !== "Employee"
         ? apiRequest("GET", `/departments/${state.user.departmentId}/users`)
@@ -322,32 +477,17 @@ async function loadApprovalsData() {
 }
 
 // Dashboard Functions
-function updateDashboardStats() {
-  const stats = calculateTaskStats(state.tasks);
-
-  document.getElementById("total-tasks").textContent = stats.total;
-  document.getElementById("completed-tasks").textContent = stats.completed;
-  document.getElementById("in-progress-tasks").textContent = stats.inProgress;
-  document.getElementById("overdue-tasks").textContent = stats.overdue;
+function updateDashboardStats(summary) {
+  document.getElementById("total-tasks").textContent = summary.totalTasks;
+  document.getElementById("completed-tasks").textContent =
+    summary.tasksByStatus["Done"];
+  document.getElementById("in-progress-tasks").textContent =
+    summary.tasksByStatus["In Progress"];
+  document.getElementById("overdue-tasks").textContent = summary.overdueTasks;
 }
 
-function calculateTaskStats(tasks) {
-  const now = new Date();
-
-  return {
-    total: tasks.length,
-    completed: tasks.filter((t) => t.status === "Done").length,
-    inProgress: tasks.filter((t) => t.status === "In Progress").length,
-    overdue: tasks.filter((t) => {
-      if (!t.dueDate) return false;
-      return new Date(t.dueDate) < now && t.status !== "Done";
-    }).length,
-  };
-}
-
-function renderRecentTasks() {
+function renderRecentTasks(recentTasks) {
   const container = document.getElementById("recent-tasks-list");
-  const recentTasks = state.tasks.slice(0, 5);
 
   if (recentTasks.length === 0) {
     container.innerHTML = '<p class="no-data">No recent tasks</p>';
@@ -488,9 +628,10 @@ function renderTaskColumn(containerId, tasks) {
 }
 
 function setupKanbanFilters() {
-  document
-    .getElementById("task-filter")
-    .addEventListener("change", renderKanbanBoard);
+  document.getElementById("task-filter").onchange = () => {
+    state.tasksCursor = null;
+    loadKanbanData();
+  };
 }
 
 // Drag and Drop for Kanban
@@ -508,9 +649,13 @@ async function handleTaskMove(taskId, newStatus) {
     await apiRequest("PATCH", `/tasks/${taskId}`, { status: newStatus });
 
     // Update local state
-    const task = state.tasks.find((t) => t.id === taskId);
-    if (task) {
-      task.status = newStatus;
+    if (state.tasksCursor) {
+      await loadKanbanData();
+    } else {
+      const task = state.tasks.find((t) => t.id === taskId);
+      if (task) {
+        task.status = newStatus;
+      }
     }
 
     renderKanbanBoard();
@@ -976,6 +1121,7 @@ document.addEventListener("DOMContentLoaded", function () {
   if (getAuthToken()) {
     loadUserProfile().then(() => {
       if (state.user) {
+        connectEventStream();
         showPage("dashboard-page");
         setupUserInterface();
         loadDashboardData();
@@ -0,0 +1,104 @@
+"""
+Shared fixtures: a temporary file-backed SQLite database migrated to head,
+synthetic datasets from backend.generate, and an httpx client on the ASGI app.
+
+DATABASE_URL must point at the temporary database before backend.database
+is imported, because the engines are created at import time.
+"""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+DATA_DIR = tempfile.mkdtemp(prefix="taskflow-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DATA_DIR, 'taskflow.db')}"
+os.environ.setdefault("EVENT_BACKEND", "memory")
+
+import httpx
+import pytest
+from sqlalchemy import delete, event
+
+from backend.database import async_engine, engine, init_db
+from backend.generate import GENERATED_DOMAIN, GENERATED_PASSWORD, generate
+from backend.main import app
+from backend.memberships import department_members, department_users
+from backend.models import Base
+from backend.principals import principal_cache
+
+SMALL_DATASET = {"departments": 3, "users": 30, "tasks": 60, "days": 5, "seed": 1}
+LARGE_DATASET = {"departments": 3, "users": 150, "tasks": 900, "days": 30, "seed": 1}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db(seed=False)
+    yield
+    engine.dispose()
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+def clear_caches():
+    for cache in (principal_cache, department_members, department_users):
+        cache.clear()
+
+
+def empty_database():
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(delete(table))
+    clear_caches()
+
+
+def load_dataset(size: dict):
+    """Replace every row with a freshly generated dataset of the given size"""
+    empty_database()
+    generate(**size)
+    clear_caches()
+
+
+@pytest.fixture
+def dataset():
+    """Callable loading a dataset; the database is emptied again afterwards"""
+    yield load_dataset
+    empty_database()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        # Disposes the async engine; without it aiosqlite threads keep the process alive
+        await app.router.shutdown()
+
+
+async def login(client: httpx.AsyncClient, account: str) -> dict:
+    """Authorization header of a generated account, e.g. "hod1" """
+    response = await client.post(
+        "/api/auth/login", json={"email": f"{account}@{GENERATED_DOMAIN}", "password": GENERATED_PASSWORD}
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return {"headers": {"Authorization": f"Bearer {body['token']}"}, "user": body["user"]}
+
+
+@contextmanager
+def recorded_statements():
+    """SQL statements the request path (async engine) executes inside the block"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
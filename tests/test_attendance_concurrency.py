@@ -0,0 +1,53 @@
+"""
+Check-in race safety: a burst of parallel check-ins per user leaves one
+attendance row per user per day
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from backend.database import engine
+from backend.models import Attendance
+
+from .conftest import SMALL_DATASET, login
+
+pytestmark = pytest.mark.anyio
+
+USERS = 10
+CHECKINS_PER_USER = 100
+
+
+async def test_parallel_checkins_create_one_row_per_user_per_day(client, dataset):
+    dataset(SMALL_DATASET)
+    with engine.begin() as connection:
+        connection.execute(delete(Attendance).where(Attendance.date == datetime.utcnow().date()))
+    accounts = [await login(client, f"employee{number}") for number in range(1, USERS + 1)]
+
+    async def check_in(account):
+        response = await client.post("/api/attendance/checkin", headers=account["headers"])
+        return account["user"]["id"], response.status_code
+
+    # Let every request finish before asserting, so none is still writing during teardown
+    results = await asyncio.gather(*(
+        check_in(account) for _ in range(CHECKINS_PER_USER) for account in accounts
+    ), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    assert not errors, errors[0]
+
+    statuses = Counter(results)
+    for account in accounts:
+        user_id = account["user"]["id"]
+        assert statuses[(user_id, 200)] == 1, statuses
+        assert statuses[(user_id, 400)] == CHECKINS_PER_USER - 1, statuses
+
+    with engine.connect() as connection:
+        rows_per_day = connection.execute(
+            select(Attendance.user_id, Attendance.date, func.count())
+            .group_by(Attendance.user_id, Attendance.date)
+        ).all()
+    assert all(count == 1 for _, _, count in rows_per_day)
+    today = datetime.utcnow().date()
+    assert sum(1 for _, day, _ in rows_per_day if day == today) == USERS
@@ -0,0 +1,59 @@
+"""
+Department and principal caches are invalidated when a change commits,
+not when it is flushed
+"""
+from sqlalchemy import select
+
+from backend.database import SessionLocal
+from backend.memberships import department_members, department_users
+from backend.models import Department, User
+from backend.principals import principal_cache
+
+from .conftest import SMALL_DATASET
+
+STALE = "stale"
+
+
+def cache_stale_entries(user):
+    department_members.set(user.department_id, STALE)
+    department_users.set(user.department_id, STALE)
+    principal_cache.set(user.id, STALE)
+
+
+def test_moving_a_user_evicts_caches_on_commit(dataset):
+    dataset(SMALL_DATASET)
+    with SessionLocal() as db:
+        user = db.scalar(select(User).where(User.email == "employee1@example.com"))
+        old_department_id = user.department_id
+        new_department_id = db.scalar(select(Department.id).where(Department.id != old_department_id).limit(1))
+        cache_stale_entries(user)
+        department_members.set(new_department_id, STALE)
+
+        user.department_id = new_department_id
+        db.flush()
+        # Not committed yet: other sessions still read the old rows, so the entries stay
+        assert department_members.get(old_department_id) == STALE
+        assert principal_cache.get(user.id) == STALE
+
+        db.commit()
+        for department_id in (old_department_id, new_department_id):
+            assert department_members.get(department_id) is None
+            assert department_users.get(department_id) is None
+        assert principal_cache.get(user.id) is None
+
+
+def test_rolled_back_change_evicts_nothing(dataset):
+    dataset(SMALL_DATASET)
+    with SessionLocal() as db:
+        user = db.scalar(select(User).where(User.email == "employee1@example.com"))
+        department = db.get(Department, user.department_id)
+        cache_stale_entries(user)
+
+        department.name = "Renamed"
+        user.name = "Renamed"
+        db.flush()
+        db.rollback()
+        db.commit()
+        assert department_members.get(user.department_id) == STALE
+        assert department_users.get(user.department_id) == STALE
+        assert principal_cache.get(user.id) == STALE
@@ -0,0 +1,157 @@
+"""
+Event publishing: committed writes survive broker failures, Postgres NOTIFY
+payloads stay under the 8000 byte limit, bulk writes publish one event, and
+a lost LISTEN connection is re-established
+"""
+import asyncio
+import json
+import uuid
+
+import asyncpg
+import pytest
+
+from backend import events
+from backend.events import NOTIFY_MAX_BYTES, Event, EventBroker, PostgresBackend, broker
+from backend.models import UserRole
+from backend.principals import Principal
+
+from .conftest import SMALL_DATASET, login
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingConnection:
+    """Stands in for the asyncpg LISTEN connection and keeps the NOTIFY payloads"""
+
+    def __init__(self):
+        self.payloads = []
+
+    async def execute(self, query, channel, payload):
+        self.payloads.append(payload)
+
+
+class ListenConnection(RecordingConnection):
+    """Also keeps the LISTEN and termination callbacks registered on it"""
+
+    def __init__(self):
+        super().__init__()
+        self.listeners = []
+        self.termination_listeners = []
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def add_listener(self, channel, callback):
+        self.listeners.append(channel)
+
+    async def close(self):
+        pass
+
+    def terminate(self):
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+async def test_broker_failure_does_not_fail_committed_write(client, dataset, monkeypatch):
+    dataset(SMALL_DATASET)
+    hod = await login(client, "hod1")
+
+    async def unavailable(message):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(broker.backend, "publish", unavailable)
+    response = await client.post(
+        "/api/tasks",
+        json={"title": "Written while the broker is down", "priority": "Low", "assigneeIds": [hod["user"]["id"]]},
+        headers=hod["headers"],
+    )
+    assert response.status_code == 200, response.text
+    tasks = (await client.get("/api/tasks", headers=hod["headers"])).json()
+    assert response.json()["id"] in {task["id"] for task in tasks}
+
+
+async def test_large_audience_is_looked_up_by_the_receiver(client, dataset):
+    dataset(SMALL_DATASET)
+    hod = await login(client, "hod1")
+    created = (await client.post(
+        "/api/tasks",
+        json={"title": "Large audience", "priority": "Low", "assigneeIds": [hod["user"]["id"]]},
+        headers=hod["headers"],
+    )).json()
+
+    backend = PostgresBackend("unused")
+    backend._conn = RecordingConnection()
+    event = Event(
+        type="task.updated",
+        data={"id": created["id"]},
+        user_ids={uuid.uuid4() for _ in range(500)},
+        department_ids={uuid.uuid4() for _ in range(500)},
+    )
+    await backend.publish(event.to_message())
+    payload = backend._conn.payloads[0]
+    assert len(payload.encode("utf-8")) <= NOTIFY_MAX_BYTES
+
+    receiver = EventBroker(backend)
+    # Only an assignee of the task, so delivery depends on the looked-up audience
+    principal = Principal(
+        id=uuid.UUID(hod["user"]["id"]), name="", email="", role=UserRole.EMPLOYEE,
+        department_id=None, department_name=None
+    )
+    _, queue = receiver.subscribe(principal)
+    receiver._deliver(json.loads(payload))
+    delivered = await asyncio.wait_for(queue.get(), timeout=5)
+    assert delivered.data == {"id": created["id"]}
+
+
+async def test_bulk_write_publishes_one_event(client, dataset):
+    dataset(SMALL_DATASET)
+    hod = await login(client, "hod1")
+    principal = Principal(
+        id=uuid.UUID(hod["user"]["id"]), name="", email="", role=UserRole.EMPLOYEE,
+        department_id=None, department_name=None
+    )
+    subscription = broker.subscribe(principal)
+    try:
+        response = await client.post(
+            "/api/tasks/bulk",
+            json={"tasks": [
+                {"title": f"Bulk {i}", "priority": "Low", "assigneeIds": [hod["user"]["id"]]} for i in range(5)
+            ]},
+            headers=hod["headers"],
+        )
+        assert response.status_code == 200, response.text
+        _, queue = subscription
+        assert queue.qsize() == 1
+        event = queue.get_nowait()
+        assert event.type == "tasks.bulk"
+        assert event.data == {"action": "created", "ids": [task["id"] for task in response.json()]}
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def test_lost_listen_connection_reconnects(monkeypatch):
+    connections, dsns = [], []
+
+    async def connect(dsn):
+        dsns.append(dsn)
+        connections.append(ListenConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    monkeypatch.setattr(events, "EVENT_RECONNECT_MIN_DELAY", 0)
+    delivered = []
+    backend = PostgresBackend("postgresql+psycopg2://taskflow@db/taskflow")
+    await backend.start(delivered.append)
+    assert dsns == ["postgresql://taskflow@db/taskflow"]
+
+    connections[0].terminate()
+    # Disconnected: delivered to this worker instead of raising on the closed connection
+    message = Event(type="task.updated", data={"id": str(uuid.uuid4())}).to_message()
+    await backend.publish(message)
+    assert delivered == [message]
+
+    await asyncio.wait_for(backend._reconnect, timeout=5)
+    assert connections[1].listeners == [events.EVENT_CHANNEL]
+    await backend.publish(message)
+    assert len(connections[1].payloads) == 1
+    await backend.stop()
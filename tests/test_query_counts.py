@@ -0,0 +1,50 @@
+"""
+N+1 regression suite: the statements each list endpoint issues must not
+depend on how many rows it returns.
+
+Every endpoint is measured on a small and a large generated dataset with
+all in-process caches cleared before the request, so both sizes take the
+same cache-miss path.
+"""
+import pytest
+
+from .conftest import LARGE_DATASET, SMALL_DATASET, clear_caches, login, recorded_statements
+
+pytestmark = pytest.mark.anyio
+
+# (account, path template); department paths use hod1's department
+ENDPOINTS = [
+    ("hod1", "/api/tasks"),
+    ("employee1", "/api/tasks"),
+    ("admin1", "/api/tasks"),
+    ("hod1", "/api/wfh"),
+    ("admin1", "/api/wfh"),
+    ("hod1", "/api/departments/{department_id}/users"),
+    ("admin1", "/api/departments/{department_id}/users"),
+]
+
+
+async def measure(client, account: str, path: str):
+    """(statement count, returned rows) of one request, made after a cold cache"""
+    auth = await login(client, account)
+    hod = await login(client, "hod1")
+    url = path.format(department_id=hod["user"]["departmentId"])
+    clear_caches()
+    with recorded_statements() as statements:
+        response = await client.get(url, headers=auth["headers"])
+    assert response.status_code == 200, response.text
+    return len(statements), len(response.json())
+
+
+@pytest.mark.parametrize("account,path", ENDPOINTS)
+async def test_query_count_does_not_grow_with_rows(client, dataset, account, path):
+    dataset(SMALL_DATASET)
+    small_queries, small_rows = await measure(client, account, path)
+    dataset(LARGE_DATASET)
+    large_queries, large_rows = await measure(client, account, path)
+
+    assert large_rows > small_rows, "the large dataset must return more rows to prove anything"
+    assert large_queries == small_queries, (
+        f"{account} {path}: {small_queries} statements for {small_rows} rows, "
+        f"{large_queries} for {large_rows}"
+    )
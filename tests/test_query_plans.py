@@ -0,0 +1,104 @@
+"""
+Index usage of each list endpoint's main query (SQLite EXPLAIN QUERY PLAN)
+
+Runs the queries the endpoints build, for an employee and a HOD, on an
+analyzed generated dataset. Each must reach its rows through the indexes
+of migration 0002 rather than a full table scan. Super Admin lists are
+unfiltered and not covered.
+"""
+import re
+
+import pytest
+from sqlalchemy import event, select
+
+from backend.database import engine
+from backend.main import (
+    department_users_query, scoped_tasks_query, scoped_wfh_query, task_logs_query
+)
+from backend.memberships import department_members
+from backend.models import Task, TaskLog, User
+from backend.principals import Principal
+
+from .conftest import empty_database, load_dataset
+
+# Enough departments that one department is a small share of each table, as in production
+PLAN_DATASET = {"departments": 10, "users": 500, "tasks": 2000, "days": 20, "seed": 1}
+
+# A table read without any index: "SCAN tasks", but not "SCAN tasks USING INDEX ..."
+FULL_SCAN = re.compile(r"^SCAN \w+(?!\w| USING (COVERING )?INDEX)")
+
+
+@pytest.fixture(scope="module")
+def principals():
+    load_dataset(PLAN_DATASET)
+    with engine.connect() as connection:
+        users = {
+            account: connection.execute(
+                select(User).where(User.email == f"{account}@example.com")
+            ).one()
+            for account in ("hod1", "employee1")
+        }
+    yield {
+        account: Principal(
+            id=user.id, name=user.name, email=user.email, role=user.role,
+            department_id=user.department_id, department_name=None
+        )
+        for account, user in users.items()
+    }
+    empty_database()
+
+
+def query_plan(query) -> list:
+    """EXPLAIN QUERY PLAN details of the statement SQLAlchemy sends for query"""
+    with engine.connect() as connection:
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(connection, "before_cursor_execute", record)
+        connection.execute(query).all()
+        event.remove(connection, "before_cursor_execute", record)
+        statement, parameters = statements[0]
+        return [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+
+
+def tasks_page(principal):
+    return scoped_tasks_query(principal).order_by(Task.created_at.desc(), Task.id.desc()).limit(101)
+
+
+# (name, account, query builder, indexes the plan must use)
+CASES = [
+    ("tasks", "employee1", tasks_page, ["ix_tasks_created_at_id", "ix_task_assignees_task_id"]),
+    ("tasks", "hod1", tasks_page, ["ix_tasks_created_at_id", "ix_task_assignees_task_id", "ix_users_department_id"]),
+    ("wfh", "employee1", scoped_wfh_query, ["ix_wfh_requests_user_id_status"]),
+    ("wfh", "hod1", scoped_wfh_query, ["ix_wfh_requests_user_id_status", "ix_users_department_id"]),
+    ("department users", "hod1", lambda p: department_users_query(p.department_id), ["ix_users_department_id"]),
+    (
+        "task logs", "employee1",
+        lambda p: task_logs_query(p.id).order_by(TaskLog.created_at.desc()),
+        ["ix_task_logs_user_id_date"]
+    ),
+]
+
+
+@pytest.mark.parametrize("name,account,build,indexes", CASES, ids=[f"{c[0]}-{c[1]}" for c in CASES])
+def test_list_query_uses_indexes(principals, name, account, build, indexes):
+    # Cold membership cache: HOD scopes use the department_id subquery
+    department_members.clear()
+    plan = query_plan(build(principals[account]))
+
+    scans = [detail for detail in plan if FULL_SCAN.match(detail)]
+    assert not scans, f"{name} as {account} scans whole tables: {plan}"
+    for index in indexes:
+        assert any(index in detail for detail in plan), f"{name} as {account} does not use {index}: {plan}"
+
+
+def test_cached_department_scope_uses_indexes(principals):
+    # Warm membership cache: HOD scopes filter on a literal id list instead
+    hod = principals["hod1"]
+    department_members.set(hod.department_id, frozenset([hod.id, principals["employee1"].id]))
+    for query in (tasks_page(hod), scoped_wfh_query(hod)):
+        plan = query_plan(query)
+        assert not [detail for detail in plan if FULL_SCAN.match(detail)], plan
+    department_members.clear()
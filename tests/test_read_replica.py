@@ -0,0 +1,46 @@
+"""
+Read-your-writes: the last-write cookie keeps a client's reads on the primary,
+whichever worker serves them
+"""
+import time
+
+import pytest
+
+from backend import database
+from backend.database import (
+    DB_REPLICA_STICKY_SECONDS, LAST_WRITE_COOKIE, async_engine, replica_router, wrote_recently
+)
+
+from .conftest import SMALL_DATASET, login
+
+pytestmark = pytest.mark.anyio
+
+
+def test_last_write_marker_expires():
+    assert wrote_recently(str(time.time()))
+    assert not wrote_recently(str(time.time() - DB_REPLICA_STICKY_SECONDS - 1))
+    assert not wrote_recently(None)
+    assert not wrote_recently("garbage")
+
+
+async def test_write_keeps_the_client_on_the_primary(client, dataset, monkeypatch):
+    dataset(SMALL_DATASET)
+    # A configured, current replica (only the routing decision is exercised)
+    monkeypatch.setattr(database, "replica_engine", async_engine)
+    monkeypatch.setattr(replica_router, "replica_is_fresh", lambda: True)
+    hod = await login(client, "hod1")
+
+    response = await client.post(
+        "/api/tasks",
+        json={"title": "Read your writes", "priority": "Low", "assigneeIds": [hod["user"]["id"]]},
+        headers=hod["headers"],
+    )
+    assert response.status_code == 200, response.text
+    assert wrote_recently(response.cookies.get(LAST_WRITE_COOKIE))
+
+    # The client sends the cookie back, so the read stays on the primary and sees the task
+    primary_reads, replica_reads = replica_router.primary_reads, replica_router.replica_reads
+    tasks = (await client.get("/api/tasks", headers=hod["headers"])).json()
+    assert response.json()["id"] in {task["id"] for task in tasks}
+    assert replica_router.primary_reads == primary_reads + 1
+    assert replica_router.replica_reads == replica_reads
@@ -0,0 +1,84 @@
+"""
+Delta sync: department moves in and out of HOD scope, and the retention cutoff
+"""
+import base64
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from backend.database import SessionLocal
+from backend.models import TASK_TOMBSTONE_RETENTION_DAYS, Department, Task, TaskAssignee, User
+
+from .conftest import SMALL_DATASET, clear_caches, login
+
+pytestmark = pytest.mark.anyio
+
+
+def cursor_at(moment: datetime) -> str:
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode()
+
+
+async def test_assignee_moving_department_removes_task_from_old_hod(client, dataset):
+    dataset(SMALL_DATASET)
+    hod = await login(client, "hod1")
+    hod_id = uuid.UUID(hod["user"]["id"])
+    department_id = uuid.UUID(hod["user"]["departmentId"])
+    cursor = (await client.get("/api/tasks/changes", headers=hod["headers"])).json()["cursor"]
+
+    with SessionLocal() as db:
+        # A single-assignee task in hod1's department that hod1 did not create
+        task_id, assignee_id = db.execute(
+            select(Task.id, TaskAssignee.assignee_id)
+            .join(TaskAssignee, TaskAssignee.task_id == Task.id)
+            .join(User, User.id == TaskAssignee.assignee_id)
+            .where(User.department_id == department_id, Task.assigner_id != hod_id)
+            .where(~Task.assignees.any(TaskAssignee.assignee_id != User.id))
+            .limit(1)
+        ).one()
+        assignee = db.get(User, assignee_id)
+        assignee.department_id = db.scalar(select(Department.id).where(Department.id != department_id).limit(1))
+        db.commit()
+    clear_caches()
+
+    changes = (await client.get("/api/tasks/changes", params={"since": cursor}, headers=hod["headers"])).json()
+    assert str(task_id) in changes["removedTaskIds"]
+    tasks = (await client.get("/api/tasks", params={"limit": 500}, headers=hod["headers"])).json()
+    assert str(task_id) not in {task["id"] for task in tasks}
+
+
+async def test_assignee_joining_department_adds_task_for_new_hod(client, dataset):
+    dataset(SMALL_DATASET)
+    hod = await login(client, "hod1")
+    department_id = uuid.UUID(hod["user"]["departmentId"])
+    cursor = (await client.get("/api/tasks/changes", headers=hod["headers"])).json()["cursor"]
+
+    with SessionLocal() as db:
+        # A single-assignee task of another department
+        task_id, assignee_id = db.execute(
+            select(Task.id, TaskAssignee.assignee_id)
+            .join(TaskAssignee, TaskAssignee.task_id == Task.id)
+            .join(User, User.id == TaskAssignee.assignee_id)
+            .where(User.department_id != department_id)
+            .where(~Task.assignees.any(TaskAssignee.assignee_id != User.id))
+            .limit(1)
+        ).one()
+        db.get(User, assignee_id).department_id = department_id
+        db.commit()
+    clear_caches()
+
+    changes = (await client.get("/api/tasks/changes", params={"since": cursor}, headers=hod["headers"])).json()
+    assert str(task_id) in {task["id"] for task in changes["tasks"]}
+    assert str(task_id) not in changes["removedTaskIds"]
+
+
+async def test_cursor_older_than_retention_is_rejected(client, dataset):
+    dataset(SMALL_DATASET)
+    hod = await login(client, "hod1")
+    expired = cursor_at(datetime.utcnow() - timedelta(days=TASK_TOMBSTONE_RETENTION_DAYS, hours=1))
+    response = await client.get("/api/tasks/changes", params={"since": expired}, headers=hod["headers"])
+    assert response.status_code == 410
+    fresh = cursor_at(datetime.utcnow() - timedelta(days=TASK_TOMBSTONE_RETENTION_DAYS - 1))
+    response = await client.get("/api/tasks/changes", params={"since": fresh}, headers=hod["headers"])
+    assert response.status_code == 200